@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Batch process chat exports and generate SQL."""
+
+import argparse
+import os
+import sys
+from functools import partial
+
+import compression
+import engine
+
+def run_sql(argv, description):
+    """Run ``create_sql`` in this process instead of a fresh interpreter."""
+    import create_sql
+
+    print(f"--- {description} ---")
+    print(f"Running: create_sql {' '.join(argv)}")
+    try:
+        create_sql.main(argv)
+    except SystemExit as e:
+        if e.code:
+            print(f"Error during {description}:", file=sys.stderr)
+            print(e.code, file=sys.stderr)
+            sys.exit(1)
+
+def sql_job(job, layout="full", utf8=False):
+    """Build one conversation and return ``(format, chat row)`` for the SQL."""
+    import create_sql
+
+    plugin, conv, user_id, _ = job
+    name, out = engine.render_conversation(plugin, conv, user_id, layout)
+    return plugin.name, create_sql.chat_row(out, name, [f"imported-{plugin.name}"], utf8)
+
+def write_sql_direct(inputs, types, user_id, sql_path, workers=1, branches=False, compress=None, layout="full", utf8=False):
+    """Generate the SQL straight from the parsed exports.
+
+    Each chat goes from ``build_webui`` to its SQL literal in memory, so it
+    is serialised once instead of being written, re-read and re-serialised.
+    The script matches the one built from intermediate JSON files.
+    """
+    import create_sql
+
+    writers = {fmt: create_sql.ScriptWriter([f"imported-{fmt}"]) for fmt in types}
+    for fmt, row in engine.map_conversations(partial(sql_job, layout=layout, utf8=utf8), inputs, user_id, workers=workers, branches=branches):
+        writers[fmt].add(row)
+    with compression.open_write(sql_path, compress, text=True) as out:
+        for fmt in types:
+            writers[fmt].write_to(out)
+
+def main(argv=None, prog=None):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Batch process chat exports and generate SQL for Open WebUI.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Example usage:
+  openwebui-import batch --input-dir ./chats --user-id "my-user-id" --sql-output chats.sql
+  openwebui-import batch --input-dir ./chats/gpt --type chatgpt --user-id "my-user-id"
+  openwebui-import batch --input-dir ./chats/gemini --type aistudio --user-id "uuid-123" --sql-output gemini_chats.sql
+  openwebui-import batch --input-dir ./chats --user-id "my-user-id" --sql-output chats.sql --direct
+        """
+    )
+    parser.add_argument("--input-dir", required=True, help="Directory containing the source chat files")
+    parser.add_argument("--type", default="auto", choices=["auto", *engine.FORMAT_NAMES], help="Source chat format (default: auto, detected per file)")
+    parser.add_argument("--user-id", required=True, help="Open WebUI User ID to assign to these chats")
+    parser.add_argument("--output-dir", default="output", help="Directory for intermediate JSON files (default: output)")
+    parser.add_argument("--sql-output", help="Path to the final SQL file. If not specified, SQL generation is skipped.")
+    parser.add_argument("--workers", type=int, default=1, help="Convert conversations in this many processes")
+    parser.add_argument("--branches", action="store_true", help="Import every branch of ChatGPT conversations, not only the current one")
+    parser.add_argument("--compact", action="store_true", help="Write the intermediate JSON files without indentation")
+    parser.add_argument("--compress", choices=compression.COMPRESSIONS, help="Compress the JSON files and the SQL file while writing them (zstd needs the zstandard package)")
+    parser.add_argument("--layout", choices=engine.LAYOUTS, default="full", help="Store messages in both the history tree and the list (full, the default, for current Open WebUI); history drops the list, which Open WebUI searches for message text; list drops the tree, for old versions")
+    parser.add_argument("--utf8", action="store_true", help="Write non-ASCII text in the SQL chat JSON as UTF-8 instead of \\uXXXX escapes")
+    parser.add_argument("--direct", action="store_true", help="Generate the SQL in memory without writing intermediate JSON files (requires --sql-output)")
+
+    args = parser.parse_args(argv)
+    try:
+        compression.require(args.compress)
+    except RuntimeError as exc:
+        parser.error(str(exc))
+    if args.direct and not args.sql_output:
+        parser.error("--direct requires --sql-output")
+
+    # Resolve absolute paths
+    input_dir = os.path.abspath(args.input_dir)
+    output_dir = os.path.abspath(args.output_dir)
+
+    # 1. Collect files to convert
+    if not os.path.isdir(input_dir):
+        print(f"Error: Input directory {input_dir} does not exist.", file=sys.stderr)
+        sys.exit(1)
+
+    files = []
+    for f in sorted(os.listdir(input_dir)):
+        path = os.path.join(input_dir, f)
+        if not os.path.isfile(path):
+            continue
+
+        _, ext = os.path.splitext(f)
+        if ext.lower() in ('.json', '.zip'):
+            files.append(path)
+        elif args.type in ('auto', 'aistudio') and ext == '':
+            files.append(path)
+
+    if not files:
+        msg = "No .json or .zip files found"
+        if args.type in ('auto', 'aistudio'):
+            msg = "No .json, .zip or extensionless files found"
+        print(f"{msg} in {input_dir}")
+        sys.exit(0)
+
+    # 2. Work out the format of each file
+    inputs = []
+    for path in files:
+        fmt = args.type
+        if fmt == 'auto':
+            fmt = engine.detect_format(path)
+            if fmt is None:
+                print(f"Skipping {path}: unrecognised export format")
+                continue
+        inputs.append((path, engine.get_format(fmt)))
+
+    types = sorted({plugin.name for _, plugin in inputs})
+    if not types:
+        print(f"No recognised exports found in {input_dir}")
+        sys.exit(0)
+
+    # 3. With --direct, convert every format straight to SQL in one pass
+    if args.direct:
+        sql_file_path = compression.with_suffix(os.path.abspath(args.sql_output), args.compress)
+        print(f"--- Generating SQL statements for {', '.join(types)} chats ---")
+        write_sql_direct(inputs, types, args.user_id, sql_file_path, args.workers, args.branches, args.compress, args.layout, args.utf8)
+        print(f"\n✨ Success! Generated SQL: {sql_file_path}")
+        return
+
+    # 4. Run conversion for every format in one pass
+    print(f"--- Converting {', '.join(types)} chats ---")
+    engine.convert_files(inputs, args.user_id, output_dir, workers=args.workers, branches=args.branches, compact=args.compact, compress=args.compress, layout=args.layout)
+
+    # 5. Generate SQL (optional)
+    if args.sql_output:
+        import shutil
+        import tempfile
+
+        sql_file_path = compression.with_suffix(os.path.abspath(args.sql_output), args.compress)
+
+        # One create_sql run per format so each gets its imported-<type> tag;
+        # the scripts are independent and are concatenated into one file.
+        with tempfile.TemporaryDirectory() as tmp, compression.open_write(sql_file_path, args.compress, text=True) as out:
+            for fmt in types:
+                # The converters put files in output/<type>/
+                json_dir = os.path.join(output_dir, engine.get_format(fmt).subdir)
+                part = os.path.join(tmp, f"{fmt}.sql")
+                sql_args = [json_dir, "--output", part, "--tags", f"imported-{fmt}"]
+                if args.utf8:
+                    sql_args.append("--utf8")
+                run_sql(sql_args, f"Generating SQL statements for {fmt}")
+                with open(part, "r", encoding="utf-8") as fh:
+                    shutil.copyfileobj(fh, out)
+
+        print(f"\n✨ Success! Generated SQL: {sql_file_path}")
+    else:
+        print("\nSkipping SQL generation (no --sql-output provided).")
+
+if __name__ == "__main__":
+    main()
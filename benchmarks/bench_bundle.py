@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Benchmark one file per conversation against a single --bundle file.
+
+A synthetic ChatGPT export is converted both ways and create_sql is run
+over the output directory and over the bundle. Many short conversations
+make the per-file open/close cost visible; on network volumes it is larger
+than measured here on local disk.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+import create_sql
+import engine
+from synthetic import write_chatgpt_export
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=20000)
+    parser.add_argument("--messages", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "conversations.json")
+        write_chatgpt_export(src, args.conversations, args.messages)
+        inputs = [(src, convert_chatgpt.PLUGIN)]
+        outdir = os.path.join(tmp, "files")
+        bundle = os.path.join(tmp, "chats.jsonl")
+        print(f"export: {os.path.getsize(src) / 1e6:.1f} MB, {args.conversations} conversations")
+
+        files_s, files = timed(engine.convert_files, inputs, "user", outdir)
+        bundle_s, names = timed(engine.convert_files, inputs, "user", outdir, bundle=bundle)
+        assert len(names) == len(files)
+        print(f"convert  files  {files_s:6.2f}s  {len(files)} files")
+        print(f"convert  bundle {bundle_s:6.2f}s  1 file  x{files_s / bundle_s:.2f}")
+
+        chat_dir = os.path.join(outdir, convert_chatgpt.PLUGIN.subdir)
+        sql_files_s, _ = timed(create_sql.main, [chat_dir, "--output", os.path.join(tmp, "files.sql")])
+        sql_bundle_s, _ = timed(create_sql.main, [bundle, "--output", os.path.join(tmp, "bundle.sql")])
+        sizes = [os.path.getsize(os.path.join(tmp, f"{name}.sql")) for name in ("files", "bundle")]
+        assert sizes[0] == sizes[1], sizes
+        print(f"sql      files  {sql_files_s:6.2f}s")
+        print(f"sql      bundle {sql_bundle_s:6.2f}s  x{sql_files_s / sql_bundle_s:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Benchmark importing every branch of heavily-branched ChatGPT conversations.
+
+Reports the time per node of ``iter_chatgpt(..., branches=True)`` as the
+conversation grows; a flat per-node cost shows the walk is linear.
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+from synthetic import chatgpt_branched_conversation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[5_000, 20_000, 80_000])
+    parser.add_argument("--branch-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    for nodes in args.nodes:
+        conv = chatgpt_branched_conversation(random.Random(0), nodes, args.branch_rate)
+        tree = next(convert_chatgpt.iter_chatgpt([conv], branches=True))
+        linear = next(convert_chatgpt.iter_chatgpt([conv]))
+        elapsed = min(timeit.repeat(lambda: next(convert_chatgpt.iter_chatgpt([conv], branches=True)), number=1, repeat=3))
+        print(
+            f"nodes={nodes:<7} {elapsed * 1e3:8.1f} ms  {elapsed / nodes * 1e6:5.2f} us/node"
+            f"  messages kept {len(tree['messages'])} (current branch only: {len(linear['messages'])})"
+        )
+
+
+if __name__ == "__main__":
+    main()
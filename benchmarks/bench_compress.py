@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark --compress on converter output and on the generated SQL.
+
+A synthetic ChatGPT export is converted and turned into a SQL script
+uncompressed and with each available compression; the decompressed SQL
+must be identical. zstd is skipped when zstandard is not installed.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import compression
+import convert_chatgpt
+import create_sql
+import engine
+from synthetic import write_chatgpt_export
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40)
+    args = parser.parse_args()
+
+    modes = [None, "gzip"]
+    if importlib.util.find_spec("zstandard") is not None:
+        modes.append("zstd")
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "conversations.json")
+        write_chatgpt_export(src, args.conversations, args.messages)
+        print(f"export: {os.path.getsize(src) / 1e6:.1f} MB, {args.conversations} conversations")
+        expected = None
+        for compress in modes:
+            name = compress or "none"
+            outdir = os.path.join(tmp, name)
+            start = time.perf_counter()
+            engine.convert_files([(src, convert_chatgpt.PLUGIN)], "user", outdir, compress=compress)
+            convert_s = time.perf_counter() - start
+            json_dir = os.path.join(outdir, convert_chatgpt.PLUGIN.subdir)
+            sql = os.path.join(tmp, f"{name}.sql")
+            start = time.perf_counter()
+            create_sql.main([json_dir, "--output", sql, *(["--compress", compress] if compress else [])])
+            sql_s = time.perf_counter() - start
+            sql = compression.with_suffix(sql, compress)
+            with compression.open_read(sql) as fh:
+                # Message UUIDs are random, so compare the decompressed size.
+                size = len(fh.read())
+            expected = expected or size
+            assert size == expected, f"{name} SQL differs"
+            print(
+                f"{name:<5} json {dir_size(json_dir) / 1e6:7.1f} MB in {convert_s:5.2f}s  "
+                f"sql {os.path.getsize(sql) / 1e6:7.1f} MB in {sql_s:5.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark ordering of Grok ``mapping`` conversations.
+
+The previous implementation, which sorted every node by its timestamp, is
+kept here as the reference. It is timed against the parent/children walk in
+convert_grok, and the number of messages it misplaces is reported.
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_grok
+from engine import parse_timestamp, sanitize_text
+from synthetic import grok_mapping_conversation
+
+
+def reference_messages(mapping, ts):
+    messages = []
+    root_node = mapping.get("client-created-root")
+    if isinstance(root_node, dict):
+        part = root_node.get("message", {}).get("content", {}).get("parts", [])
+        if part:
+            messages.append(("user", sanitize_text(part[0]), ts))
+    other_nodes = [v for k, v in mapping.items() if k != "client-created-root"]
+
+    def sort_key(node):
+        ts_val = node.get("message", {}).get("create_time") or node.get("message", {}).get("timestamp")
+        return parse_timestamp(ts_val, ts)
+
+    other_nodes.sort(key=sort_key)
+    for node in other_nodes:
+        msg = node.get("message", {})
+        parts = msg.get("content", {}).get("parts", [])
+        if not parts:
+            continue
+        role = msg.get("author", {}).get("role", "assistant")
+        ts_val = msg.get("create_time") or msg.get("timestamp") or ts
+        messages.append((role, sanitize_text(parts[0]), parse_timestamp(ts_val, ts)))
+    return messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=50_000)
+    args = parser.parse_args()
+
+    conv = grok_mapping_conversation(random.Random(0), 0, args.nodes)
+    data = {"conversations": [conv]}
+    ts = parse_timestamp(conv["conversation"]["create_time"], 0.0)
+    current = next(convert_grok.iter_grok(data))["messages"]
+    reference = reference_messages(conv["mapping"], ts)
+    assert sorted(current) == sorted(reference)
+    misplaced = sum(a != b for a, b in zip(current, reference))
+
+    before = min(timeit.repeat(lambda: reference_messages(conv["mapping"], ts), number=1, repeat=5))
+    after = min(timeit.repeat(lambda: next(convert_grok.iter_grok(data)), number=1, repeat=5))
+    print(f"nodes={args.nodes}  sort {before * 1e3:7.1f} ms -> walk {after * 1e3:7.1f} ms  x{before / after:.2f}")
+    print(f"messages out of thread order with the timestamp sort: {misplaced}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Measure chat row size and serialisation time for each --layout.
+
+A synthetic ChatGPT export is built into open-webui chats in each layout.
+Each chat is serialised as the converters write it (indented JSON) and as
+create_sql stores it in the ``chat`` column, then decoded again; the row
+size is the length of that column value.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+import engine
+import json_backend
+from synthetic import chatgpt_export
+
+
+def best_of(repeat, func, items):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = [func(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    convs = list(convert_chatgpt.iter_chatgpt(chatgpt_export(args.conversations, args.messages)))
+    plugin = convert_chatgpt.PLUGIN
+    print(f"{len(convs)} conversations x {args.messages} messages")
+
+    baseline = None
+    for layout in engine.LAYOUTS:
+        chats = [engine.build_webui(conv, "user", plugin.model, plugin.model_name, layout)[0] for conv in convs]
+        file_s, files = best_of(args.repeat, json_backend.dumps, chats)
+        row_s, rows = best_of(args.repeat, lambda c: json.dumps(c, ensure_ascii=True), chats)
+        load_s, _ = best_of(args.repeat, json.loads, rows)
+        row_mb = sum(map(len, rows)) / 1e6
+        baseline = baseline or row_mb
+        print(
+            f"{layout:<8} file {sum(map(len, files)) / 1e6:7.1f} MB in {file_s:5.2f}s  "
+            f"row {row_mb:7.1f} MB ({row_mb / baseline:4.0%}) dump {row_s:5.2f}s load {load_s:5.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
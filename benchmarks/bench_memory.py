@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Measure the memory held per message by engine.build_webui.
+
+A corpus of ``--messages`` messages is built one conversation at a time (as
+the converters do), and the bytes each built conversation keeps alive are
+summed. The previous build_webui, which grew each assistant message with
+update() and so over-allocated it, is kept here as the reference.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import uuid
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import engine
+from synthetic import sentence
+
+
+def reference_build_webui(conversation, user_id, model, model_name):
+    conv_uuid = str(uuid.uuid4())
+    messages_map = {}
+    messages_list = []
+    prev_id = None
+    for role, content, ts in conversation["messages"]:
+        msg_id = str(uuid.uuid4())
+        msg = {
+            "id": msg_id,
+            "parentId": prev_id,
+            "childrenIds": [],
+            "role": role,
+            "content": content,
+            "timestamp": int(ts),
+        }
+        if role == "user":
+            msg["models"] = [model]
+        else:
+            msg.update(
+                {
+                    "model": model,
+                    "modelName": model_name,
+                    "modelIdx": 0,
+                    "userContext": None,
+                    "lastSentence": engine.extract_last_sentence(content),
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                    "done": True,
+                }
+            )
+        if prev_id:
+            messages_map[prev_id]["childrenIds"].append(msg_id)
+        messages_map[msg_id] = msg
+        messages_list.append(msg)
+        prev_id = msg_id
+    webui = {
+        "id": "",
+        "title": conversation["title"],
+        "models": [model],
+        "params": {},
+        "history": {"messages": messages_map, "currentId": prev_id},
+        "messages": messages_list,
+        "tags": [],
+        "timestamp": int(conversation["timestamp"] * 1000),
+        "files": [],
+    }
+    if user_id:
+        webui["userId"] = user_id
+    return webui, conv_uuid
+
+
+def conversations(total: int, per_conversation: int):
+    rng = random.Random(0)
+    texts = [" ".join(sentence(rng) for _ in range(3)) for _ in range(1000)]
+    for start in range(0, total, per_conversation):
+        count = min(per_conversation, total - start)
+        yield {
+            "title": "Synthetic",
+            "timestamp": 1700000000.0,
+            "messages": [
+                engine.Message("user" if i % 2 == 0 else "assistant", texts[i % len(texts)], 1700000000.0 + i)
+                for i in range(count)
+            ],
+        }
+
+
+def measure(build, total: int, per_conversation: int):
+    held = 0
+    peak = 0
+    start = time.perf_counter()
+    tracemalloc.start()
+    for conv in conversations(total, per_conversation):
+        before = tracemalloc.get_traced_memory()[0]
+        out = build(conv, "user", engine.get_format("chatgpt").model, "model")
+        held += tracemalloc.get_traced_memory()[0] - before
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        del out
+    tracemalloc.stop()
+    return held / total, peak, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--per-conversation", type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {}
+    for name, build in (("reference", reference_build_webui), ("current", engine.build_webui)):
+        per_message, peak, elapsed = measure(build, args.messages, args.per_conversation)
+        results[name] = per_message
+        print(f"{name:<10} {per_message:7.1f} bytes/message  peak {peak / 1e6:6.1f} MB  ({elapsed:.1f}s traced)")
+    saved = results["reference"] - results["current"]
+    print(f"saved {saved:.1f} bytes/message ({saved / results['reference']:.0%}), "
+          f"{saved * args.messages / 1e6:.0f} MB over {args.messages} messages")
+
+
+if __name__ == "__main__":
+    main()
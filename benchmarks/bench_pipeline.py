@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Benchmark batch with intermediate JSON files against batch --direct.
+
+Both runs convert the same synthetic ChatGPT export and generate the SQL
+script; --direct skips writing and re-reading one JSON file per
+conversation, so each chat is serialised once.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import batch
+from synthetic import write_chatgpt_export
+
+
+def run(tmp, name, *extra):
+    output = os.path.join(tmp, f"{name}.sql")
+    argv = [
+        "--input-dir", os.path.join(tmp, "in"), "--type", "chatgpt", "--user-id", "user",
+        "--output-dir", os.path.join(tmp, name), "--sql-output", output, *extra,
+    ]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch.main(argv)
+    return time.perf_counter() - start, os.path.getsize(output)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "in"))
+        src = os.path.join(tmp, "in", "conversations.json")
+        write_chatgpt_export(src, args.conversations, args.messages)
+        print(f"export: {os.path.getsize(src) / 1e6:.1f} MB, {args.conversations} conversations")
+        files_s, files_size = run(tmp, "files")
+        compact_s, compact_size = run(tmp, "compact", "--compact")
+        direct_s, direct_size = run(tmp, "direct", "--direct")
+        assert files_size == compact_size == direct_size, (files_size, compact_size, direct_size)
+        print(f"json files          {files_s:6.2f}s")
+        print(f"json files compact  {compact_s:6.2f}s  x{files_s / compact_s:.2f}")
+        print(f"direct              {direct_s:6.2f}s  x{files_s / direct_s:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Benchmark create_sql with and without --raw on compact files and a bundle.
+
+A synthetic ChatGPT export is converted to --compact files and to a
+--bundle. create_sql turns each into a script as usual (decoding and
+re-encoding every chat) and with --raw; reading the input without
+processing it is timed as the I/O floor. Both scripts must hold the same
+decoded chats.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+import create_sql
+import engine
+from synthetic import write_chatgpt_export
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def read_only(files):
+    return sum(len(load()[1]) for _, load in create_sql.iter_chats(files, raw=True))
+
+
+def rows(files, raw):
+    return {row[0]: json.loads(row[4]) for row in create_sql.iter_rows(files, ["t"], raw=raw)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "conversations.json")
+        write_chatgpt_export(src, args.conversations, args.messages)
+        inputs = [(src, convert_chatgpt.PLUGIN)]
+        outdir = os.path.join(tmp, "files")
+        bundle = os.path.join(tmp, "chats.jsonl")
+        engine.convert_files(inputs, "user", outdir, compact=True)
+        engine.convert_files(inputs, "user", outdir, bundle=bundle)
+        chat_dir = os.path.join(outdir, convert_chatgpt.PLUGIN.subdir)
+        print(f"{args.conversations} conversations x {args.messages} messages")
+
+        for label, source in (("files", chat_dir), ("bundle", bundle)):
+            files = create_sql.gather_files([source])
+            read_s, size = timed(read_only, files)
+            assert rows(files, True) == rows(files, False), f"{label} chats differ"
+            parsed_s, _ = timed(create_sql.main, [source, "--output", os.path.join(tmp, f"{label}.sql")])
+            raw_s, _ = timed(create_sql.main, [source, "--raw", "--output", os.path.join(tmp, f"{label}-raw.sql")])
+            print(
+                f"{label:<6} {size / 1e6:6.1f} MB  read {read_s:5.2f}s  "
+                f"sql {parsed_s:5.2f}s  --raw {raw_s:5.2f}s  x{parsed_s / raw_s:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Benchmark writing and re-reading converter output with each JSON backend.
+
+A synthetic ChatGPT export is converted to open-webui conversations in
+memory; each backend then serialises them indented (the default) and
+compact (``--compact``), and decodes the result again as ``create_sql.py``
+does. The backends must produce identical bytes for each mode.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+import engine
+import json_backend
+from synthetic import chatgpt_export
+
+
+def best_of(repeat, func, items):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = [func(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    export = chatgpt_export(args.conversations, args.messages)
+    plugin = convert_chatgpt.PLUGIN
+    chats = [
+        [{"id": "", "user_id": "user", "title": conv["title"], "chat": out}]
+        for conv in convert_chatgpt.iter_chatgpt(export)
+        for out, _ in [engine.build_webui(conv, "user", plugin.model, plugin.model_name)]
+    ]
+    print(f"{len(chats)} conversations x {args.messages} messages, backends: {', '.join(json_backend.BACKENDS)}")
+
+    baseline = None
+    for compact in (False, True):
+        expected = None
+        for backend in json_backend.BACKENDS:
+            write_s, blobs = best_of(
+                args.repeat, lambda c: json_backend.dumps(c, compact, backend), chats
+            )
+            read_s, _ = best_of(args.repeat, lambda b: json_backend.loads(b, backend), blobs)
+            if expected is None:
+                expected = blobs
+            assert blobs == expected, f"{backend} output differs"
+            size = sum(map(len, blobs)) / 1e6
+            baseline = baseline or write_s + read_s
+            mode = "compact" if compact else "indent"
+            print(
+                f"{backend:<7} {mode:<8} {size:7.1f} MB  "
+                f"write {write_s:6.2f}s {size / write_s:7.1f} MB/s  "
+                f"read {read_s:6.2f}s {size / read_s:7.1f} MB/s  "
+                f"x{baseline / (write_s + read_s):.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
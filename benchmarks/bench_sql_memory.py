@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Measure the peak memory of create_sql while it writes a SQL script.
+
+Synthetic chats are read from a --bundle file, so only the script writer
+decides how much is held at once. The previous main, which kept every
+statement in a list and joined them before writing, is kept here as the
+reference; both must write the same script.
+"""
+
+import argparse
+import filecmp
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import create_sql
+import json_backend
+from synthetic import render_sql, webui_chats
+
+TAGS = ["imported-chatgpt"]
+
+
+def reference_main(files, output):
+    inserts = []
+    user_ids = set()
+    for _, load in create_sql.iter_chats(files):
+        name, data = load()
+        sql, uid = create_sql.chat_to_sql(data, name, TAGS)
+        inserts.append(sql)
+        user_ids.add(uid)
+    text = render_sql(inserts, user_ids, TAGS)
+    with open(output, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+def current_main(files, output):
+    create_sql.main([*files, "--output", output, "--tags", ",".join(TAGS)])
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.conversations:
+            bundle = os.path.join(tmp, f"chats-{count}.jsonl")
+            with open(bundle, "wb") as fh:
+                for name, data in webui_chats(count, args.messages):
+                    fh.write(json_backend.dumps({"name": name, "data": data}, compact=True) + b"\n")
+            outputs = [os.path.join(tmp, f"{kind}-{count}.sql") for kind in ("reference", "current")]
+            ref_s, ref_peak = measure(reference_main, [bundle], outputs[0])
+            cur_s, cur_peak = measure(current_main, [bundle], outputs[1])
+            assert filecmp.cmp(*outputs, shallow=False), "scripts differ"
+            size = os.path.getsize(outputs[1]) / 1e6
+            print(
+                f"{count:6d} chats  {size:7.1f} MB script  "
+                f"peak {ref_peak / 1e6:7.1f} MB -> {cur_peak / 1e6:6.1f} MB  "
+                f"time {ref_s:5.2f}s -> {cur_s:5.2f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark applying the create_sql script against create_sql --sqlite.
+
+Both import the same synthetic chats into a fixture database built from
+examples/chat.sql. The script is applied with sqlite3's executescript,
+once as is and once wrapped in a single transaction as DB Browser runs it;
+--sqlite binds the values with executemany. The resulting tables must be
+identical.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import create_sql
+import sqlite_import
+from synthetic import render_sql, webui_chats, webui_fixture_db
+
+TAGS = ["imported-chatgpt"]
+
+
+def dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [sorted(conn.execute(f'SELECT * FROM "{table}"')) for table in ("chat", "tag")]
+    finally:
+        conn.close()
+
+
+def apply_script(path, chats, transaction):
+    start = time.perf_counter()
+    inserts, user_ids = [], set()
+    for name, data in chats:
+        sql, uid = create_sql.chat_to_sql(data, name, TAGS)
+        inserts.append(sql)
+        user_ids.add(uid)
+    script = render_sql(inserts, user_ids, TAGS)
+    if transaction:
+        script = f"BEGIN;\n{script}\nCOMMIT;"
+    built = time.perf_counter()
+    conn = sqlite3.connect(path)
+    conn.executescript(script)
+    conn.commit()
+    conn.close()
+    return built - start, time.perf_counter() - built
+
+
+def import_direct(path, chats, batch_size):
+    start = time.perf_counter()
+    rows = [create_sql.chat_row(data, name, TAGS) for name, data in chats]
+    built = time.perf_counter()
+    sqlite_import.import_chats(path, rows, TAGS, batch_size)
+    return built - start, time.perf_counter() - built
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=sqlite_import.BATCH_SIZE)
+    args = parser.parse_args()
+
+    chats = webui_chats(args.conversations, args.messages)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {name: os.path.join(tmp, f"{name}.db") for name in ("script", "script-txn", "sqlite")}
+        for path in paths.values():
+            webui_fixture_db(path, ROOT_DIR)
+        print(f"{len(chats)} chats x {args.messages} messages into a copy of examples/chat.sql")
+
+        timings = {
+            "script": apply_script(paths["script"], chats, False),
+            "script-txn": apply_script(paths["script-txn"], chats, True),
+            "sqlite": import_direct(paths["sqlite"], chats, args.batch_size),
+        }
+        expected = dump(paths["sqlite"])
+        baseline = sum(timings["script"])
+        for name, (build, apply) in timings.items():
+            assert dump(paths[name]) == expected, f"{name} database differs"
+            print(
+                f"{name:<10}  build {build:6.2f}s  apply {apply:6.2f}s  "
+                f"total {build + apply:6.2f}s  x{baseline / (build + apply):.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
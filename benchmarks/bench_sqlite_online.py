@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Measure how long a concurrent writer waits during create_sql --sqlite.
+
+A stand-in for Open WebUI writes a row every few milliseconds to the same
+database and records how long each of its write transactions takes, while
+synthetic chats are imported in one large batch (--sqlite) and in online
+mode (--sqlite --online).
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import create_sql
+import sqlite_import
+from synthetic import webui_chats, webui_fixture_db
+
+TAGS = ["imported-chatgpt"]
+
+STAND_IN = """
+import sqlite3, sys, time
+conn = sqlite3.connect(sys.argv[1], isolation_level=None, timeout=60)
+print("ready", flush=True)
+waits = []
+i = 0
+while not sys.stdin.readline().strip():
+    pass
+end = time.perf_counter() + float(sys.argv[2])
+while time.perf_counter() < end:
+    start = time.perf_counter()
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("INSERT INTO tag VALUES (?, 'stand-in', 'other', 'null')", (f"stand-in-{i}",))
+    conn.execute("COMMIT")
+    waits.append((time.perf_counter() - start) * 1000)
+    i += 1
+    time.sleep(0.005)
+waits.sort()
+print(f"{len(waits)} {waits[len(waits) // 2]:.1f} {waits[int(len(waits) * 0.99)]:.1f} {waits[-1]:.1f}")
+"""
+
+
+def run(path, rows, online, seconds):
+    stand_in = subprocess.Popen(
+        [sys.executable, "-c", STAND_IN, path, str(seconds)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    stand_in.stdout.readline()
+    stand_in.stdin.write("go\n")
+    stand_in.stdin.flush()
+    start = time.perf_counter()
+    if online:
+        stats = sqlite_import.import_chats_online(path, rows, TAGS)
+        detail = f"{stats.transactions} txns, longest {stats.longest_ms:.0f} ms, {stats.retries} retries"
+    else:
+        sqlite_import.import_chats(path, rows, TAGS)
+        detail = "1 txn per 10000 chats"
+    elapsed = time.perf_counter() - start
+    writes, p50, p99, worst = stand_in.communicate(timeout=seconds + 120)[0].split()
+    return elapsed, detail, int(writes), float(p50), float(p99), float(worst)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--seconds", type=float, default=3.0, help="How long the stand-in keeps writing")
+    args = parser.parse_args()
+
+    chats = webui_chats(args.conversations, args.messages)
+    rows = [create_sql.chat_row(data, name, TAGS) for name, data in chats]
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{len(rows)} chats x {args.messages} messages; stand-in writes for {args.seconds:.0f}s")
+        for online in (False, True):
+            path = os.path.join(tmp, f"online-{online}.db")
+            webui_fixture_db(path, ROOT_DIR)
+            elapsed, detail, writes, p50, p99, worst = run(path, rows, online, args.seconds)
+            mode = "online" if online else "offline"
+            print(
+                f"{mode:<8} import {elapsed:6.2f}s ({detail})\n"
+                f"         stand-in {writes} writes, wait p50 {p50:.1f} ms  p99 {p99:.1f} ms  max {worst:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Benchmark cold start of the openwebui-import subcommands."""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY = os.path.join(ROOT_DIR, "openwebui_import.py")
+
+# Each command exits right after parsing its arguments.
+COMMANDS = {
+    "python": [sys.executable, "-c", "pass"],
+    "help": [sys.executable, ENTRY, "--help"],
+    "convert": [sys.executable, ENTRY, "convert", "--help"],
+    "sql": [sys.executable, ENTRY, "sql", "--help"],
+    "batch": [sys.executable, ENTRY, "batch", "--help"],
+}
+
+
+def time_command(cmd, runs: int) -> float:
+    # Measure with cached bytecode, as an installed copy would run; the first
+    # (uncounted) run writes the .pyc files.
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, env=env)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, env=env)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--target-ms", type=float, default=100.0, help="Cold-start budget per command")
+    args = parser.parse_args()
+
+    failed = False
+    for name, cmd in COMMANDS.items():
+        elapsed = time_command(cmd, args.runs) * 1000
+        over = name != "python" and elapsed > args.target_ms
+        failed |= over
+        print(f"{name:<8} {elapsed:7.1f} ms{'  over budget' if over else ''}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
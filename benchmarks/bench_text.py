@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark engine.sanitize_text and engine.extract_last_sentence.
+
+The previous regex implementations are kept here as the reference: the
+benchmark first checks that both give identical output for every message in
+examples/, then times them on large messages.
+"""
+
+import argparse
+import glob
+import os
+import random
+import re
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import engine
+from synthetic import sentence
+
+
+def reference_sanitize_text(text):
+    if not isinstance(text, str):
+        return ""
+    return engine.INVALID_RE.sub("", text)
+
+
+def reference_extract_last_sentence(text):
+    if not isinstance(text, str):
+        return ""
+    cleaned = text.strip()
+    if not cleaned:
+        return ""
+    matches = re.findall(r"[^.!?]*[.!?]", cleaned, flags=re.DOTALL)
+    if matches:
+        return matches[-1].strip()
+    lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
+    return lines[-1] if lines else cleaned
+
+
+def fixture_messages():
+    """Yield the raw text of every message in the example exports."""
+    for path in sorted(glob.glob(os.path.join(ROOT_DIR, "examples", "*"))):
+        fmt = engine.detect_format(path)
+        if fmt is None:
+            continue
+        plugin = engine.get_format(fmt)
+        for conv in plugin.iter_conversations(path):
+            for _, content, _ in conv["messages"]:
+                yield content
+
+
+def check_fixtures() -> int:
+    count = 0
+    for text in fixture_messages():
+        assert engine.sanitize_text(text) == reference_sanitize_text(text)
+        assert engine.extract_last_sentence(text) == reference_extract_last_sentence(text)
+        count += 1
+    return count
+
+
+def large_messages(size: int):
+    rng = random.Random(0)
+    prose = ""
+    while len(prose) < size:
+        prose += sentence(rng) + " "
+    code = ("    self.total += compute(values[index]).offset  # accumulate\n" * (size // 58 + 1))[:size]
+    return {
+        "prose": prose,
+        "code": "Here is the fix:\n```python\n" + code + "```",
+        "unicode": prose.replace("e", "é"),
+        "private-use": prose.replace(". ", ".\ue000 "),
+    }
+
+
+def per_call(fn, text) -> float:
+    """Return the time of one ``fn(text)`` call in microseconds."""
+    timer = timeit.Timer(lambda: fn(text))
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=3)) / number * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000, help="Message size in characters")
+    args = parser.parse_args()
+
+    print(f"fixtures: {check_fixtures()} messages identical")
+    pairs = (
+        ("sanitize_text", reference_sanitize_text, engine.sanitize_text),
+        ("extract_last_sentence", reference_extract_last_sentence, engine.extract_last_sentence),
+    )
+    for kind, text in large_messages(args.size).items():
+        for name, reference, current in pairs:
+            assert reference(text) == current(text)
+            before = per_call(reference, text)
+            after = per_call(current, text)
+            print(f"{kind:<12} {name:<22} {before:10.1f} us -> {after:7.1f} us  x{before / after:.0f}")
+
+
+if __name__ == "__main__":
+    main()
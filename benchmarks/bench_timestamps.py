@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Benchmark timestamp handling in the Grok and Claude parsers.
+
+The previous implementations are kept here as the reference: Grok re-parsed
+each sort key again as the message time, and Claude built datetime objects
+for reasoning durations. Output must be identical.
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_claude
+import convert_grok
+from engine import parse_timestamp, sanitize_text
+
+
+def reference_grok_messages(responses, ts):
+    def sort_key(resp):
+        ts_val = resp.get("response", {}).get("create_time")
+        return parse_timestamp(ts_val, ts)
+
+    messages = []
+    for resp in sorted([r for r in responses if isinstance(r, dict)], key=sort_key):
+        inner = resp.get("response", {})
+        text = sanitize_text(inner.get("message"))
+        if not text:
+            continue
+        sender = inner.get("sender") or "assistant"
+        role = "user" if str(sender).lower() == "human" else "assistant"
+        messages.append((role, text, parse_timestamp(inner.get("create_time"), ts)))
+    return messages
+
+
+def reference_duration(part):
+    def parse(value):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+
+    start_dt = parse(part["start_timestamp"])
+    stop_dt = parse(part["stop_timestamp"])
+    if start_dt and stop_dt and stop_dt >= start_dt:
+        return f' duration="{max(1, int(round((stop_dt - start_dt).total_seconds())))}"'
+    return ""
+
+
+def iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def grok_responses(rng: random.Random, count: int):
+    base = datetime(2025, 6, 21, tzinfo=timezone.utc)
+    return [
+        {
+            "response": {
+                "message": f"message {i}",
+                "sender": "human" if i % 2 == 0 else "assistant",
+                "create_time": iso(base + timedelta(microseconds=rng.getrandbits(36))),
+            }
+        }
+        for i in range(count)
+    ]
+
+
+def thinking_parts(rng: random.Random, count: int):
+    base = datetime(2025, 6, 21, tzinfo=timezone.utc)
+    parts = []
+    for _ in range(count):
+        start = base + timedelta(microseconds=rng.getrandbits(36))
+        stop = start + timedelta(microseconds=rng.getrandbits(26))
+        parts.append({
+            "type": "thinking",
+            "thinking": "Considering the question.",
+            "start_timestamp": iso(start),
+            "stop_timestamp": iso(stop),
+        })
+    return parts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50_000, help="Responses / reasoning blocks per run")
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    responses = grok_responses(rng, args.count)
+    data = {"conversations": [{"conversation": {"title": "t", "create_time": 0}, "responses": responses}]}
+    current = next(convert_grok.iter_grok(data))["messages"]
+    assert current == reference_grok_messages(responses, 0.0)
+    before = min(timeit.repeat(lambda: reference_grok_messages(responses, 0.0), number=1, repeat=5))
+    after = min(timeit.repeat(lambda: next(convert_grok.iter_grok(data)), number=1, repeat=5))
+    print(f"grok responses      {before * 1e3:7.1f} ms -> {after * 1e3:7.1f} ms  x{before / after:.2f}")
+
+    parts = thinking_parts(rng, args.count)
+    for part in parts:
+        assert reference_duration(part) in convert_claude._format_reasoning_block(part)
+    print(f"claude durations    {len(parts)} reasoning blocks identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark applying create_sql scripts: per-chat statements against --upsert-batch.
+
+The scripts for the same synthetic chats are applied with sqlite3's
+executescript to a fixture database built from examples/chat.sql, with
+chat.id as the primary key as in Open WebUI. The per-chat script is applied
+as is and wrapped in one transaction, as DB Browser runs it. The resulting
+tables must be identical.
+"""
+
+import argparse
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import create_sql
+from synthetic import render_sql, webui_chats, webui_fixture_db
+
+TAGS = ["imported-chatgpt"]
+
+
+def dump(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [sorted(conn.execute(f'SELECT * FROM "{table}"')) for table in ("chat", "tag")]
+    finally:
+        conn.close()
+
+
+def upsert_script(rows, batch_size):
+    writer = create_sql.ScriptWriter(TAGS, batch_size)
+    for row in rows:
+        writer.add(row)
+    out = io.StringIO()
+    writer.write_to(out)
+    return out.getvalue()
+
+
+def apply(path, script):
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    conn.executescript(script)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=20000)
+    parser.add_argument("--messages", type=int, default=4)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    chats = webui_chats(args.conversations, args.messages)
+    rows = [create_sql.chat_row(data, name, TAGS) for name, data in chats]
+    inserts = [create_sql.chat_to_sql(data, name, TAGS)[0] for name, data in chats]
+    per_chat = render_sql(inserts, {row[1] for row in rows}, TAGS)
+    scripts = {
+        "per-chat": per_chat,
+        "per-chat txn": f"BEGIN;\n{per_chat}\nCOMMIT;",
+        **{f"upsert {size}": upsert_script(rows, size) for size in args.batch_sizes},
+    }
+    print(f"{len(rows)} chats x {args.messages} messages, chat.id primary key")
+    with tempfile.TemporaryDirectory() as tmp:
+        expected = None
+        baseline = None
+        for name, script in scripts.items():
+            path = os.path.join(tmp, f"{name.replace(' ', '-')}.db")
+            webui_fixture_db(path, ROOT_DIR, primary_key=True)
+            elapsed = apply(path, script)
+            tables = dump(path)
+            expected = expected or tables
+            assert tables == expected, f"{name} database differs"
+            baseline = baseline or elapsed
+            statements = script.count(";\n") + 1
+            print(f"{name:<13} {statements:7d} statements  apply {elapsed:7.2f}s  x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Compare create_sql scripts with ASCII-escaped and UTF-8 (--utf8) JSON.
+
+Synthetic chats written in English and in a mix of Chinese, Japanese,
+Russian, Arabic and emoji are turned into a SQL script both ways; each
+script is applied in one transaction to a fixture database built from
+examples/chat.sql. Both databases must hold the same decoded chats.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import create_sql
+from synthetic import MULTILINGUAL_WORDS, WORDS, webui_chats, webui_fixture_db
+
+TAGS = ["imported-chatgpt"]
+
+
+def script(chats, utf8):
+    writer = create_sql.ScriptWriter(TAGS)
+    for name, data in chats:
+        writer.add(create_sql.chat_row(data, name, TAGS, utf8))
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as out:
+        writer.write_to(out)
+        out.seek(0)
+        return out.read()
+
+
+def apply(path, sql):
+    webui_fixture_db(path, ROOT_DIR)
+    start = time.perf_counter()
+    conn = sqlite3.connect(path)
+    conn.executescript(f"BEGIN;\n{sql}\nCOMMIT;")
+    elapsed = time.perf_counter() - start
+    rows = sorted((chat_id, json.loads(chat)) for chat_id, chat in conn.execute('SELECT "id", "chat" FROM "chat"'))
+    db_bytes = conn.execute('SELECT SUM(LENGTH(CAST("chat" AS BLOB))) FROM "chat"').fetchone()[0]
+    conn.close()
+    return elapsed, rows, db_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for text, vocabulary in (("english", WORDS), ("multilingual", MULTILINGUAL_WORDS)):
+            chats = webui_chats(args.conversations, args.messages, vocabulary=vocabulary)
+            print(f"{text}: {len(chats)} chats x {args.messages} messages")
+            results = {}
+            for utf8 in (False, True):
+                mode = "utf8" if utf8 else "ascii"
+                sql = script(chats, utf8)
+                elapsed, rows, db_bytes = apply(os.path.join(tmp, f"{text}-{mode}.db"), sql)
+                results[mode] = rows
+                print(
+                    f"  {mode:<6} script {len(sql.encode('utf-8')) / 1e6:7.1f} MB  "
+                    f"chat column {db_bytes / 1e6:7.1f} MB  apply {elapsed:6.2f}s"
+                )
+            assert results["utf8"] == results["ascii"], f"{text} databases differ"
+
+
+if __name__ == "__main__":
+    main()
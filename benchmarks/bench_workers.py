@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Benchmark convert_chatgpt.convert_file with different --workers values."""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+from synthetic import write_chatgpt_export
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--conversations", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "conversations.json")
+        write_chatgpt_export(src, args.conversations, args.messages)
+        print(f"export: {os.path.getsize(src) / 1e6:.1f} MB, {args.conversations} conversations")
+        baseline = None
+        for workers in sorted(set(args.workers)):
+            outdir = os.path.join(tmp, f"out-{workers}")
+            start = time.perf_counter()
+            convert_chatgpt.convert_file(src, "user", outdir, workers=workers)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            rate = args.conversations / elapsed
+            print(f"workers={workers:<3} {elapsed:7.2f}s  {rate:8.0f} conv/s  speedup x{baseline / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    main()
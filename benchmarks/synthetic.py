@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Generate synthetic exports for the benchmarks."""
+
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Tuple
+
+WORDS = (
+    "photosynthesis converts light energy into chemical energy stored in glucose "
+    "plants absorb carbon dioxide and release oxygen through small pores"
+).split()
+
+
+# The same kind of text in Chinese, Japanese, Russian and Arabic, with emoji.
+MULTILINGUAL_WORDS = (
+    "光合作用 将 光能 转化 为 储存在 葡萄糖 中的 化学能 "
+    "植物 は 小さな 気孔 から 二酸化炭素 を 吸収 する "
+    "растения поглощают углекислый газ и выделяют кислород "
+    "النباتات تمتص ثاني أكسيد الكربون 🌱 ☀️ 🍃 😀"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 12, vocabulary: List[str] = WORDS) -> str:
+    return " ".join(rng.choice(vocabulary) for _ in range(words)).capitalize() + "."
+
+
+def chatgpt_conversation(
+    rng: random.Random, index: int, messages: int, vocabulary: List[str] = WORDS
+) -> Dict[str, Any]:
+    """Return a linear ChatGPT-style conversation with ``messages`` nodes."""
+    base = 1700000000.0 + index * 3600
+    mapping: Dict[str, Any] = {
+        "client-created-root": {"id": "client-created-root", "message": None, "parent": None, "children": []}
+    }
+    parent = "client-created-root"
+    for i in range(messages):
+        node_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        role = "user" if i % 2 == 0 else "assistant"
+        text = " ".join(sentence(rng, vocabulary=vocabulary) for _ in range(1 if role == "user" else 6))
+        mapping[node_id] = {
+            "id": node_id,
+            "message": {
+                "id": node_id,
+                "author": {"role": role, "name": None, "metadata": {}},
+                "create_time": base + i,
+                "content": {"content_type": "text", "parts": [text]},
+            },
+            "parent": parent,
+            "children": [],
+        }
+        mapping[parent]["children"].append(node_id)
+        parent = node_id
+    return {
+        "title": f"Synthetic conversation {index}",
+        "create_time": base,
+        "update_time": base + messages,
+        "mapping": mapping,
+        "current_node": parent,
+        "conversation_id": str(uuid.UUID(int=rng.getrandbits(128))),
+    }
+
+
+def chatgpt_export(
+    conversations: int, messages: int, seed: int = 0, vocabulary: List[str] = WORDS
+) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [chatgpt_conversation(rng, i, messages, vocabulary) for i in range(conversations)]
+
+
+def write_chatgpt_export(path: str, conversations: int, messages: int, seed: int = 0) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(chatgpt_export(conversations, messages, seed), fh)
+
+
+def grok_mapping_conversation(rng: random.Random, index: int, messages: int) -> Dict[str, Any]:
+    """Return a Grok conversation whose messages are linked in a ``mapping``.
+
+    Times have one-second resolution and advance every other message, so
+    half of the neighbouring messages tie and only the links give the order.
+    """
+    conv = chatgpt_conversation(rng, index, messages)
+    del conv["mapping"]["client-created-root"]["message"]
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc) + timedelta(hours=index)
+    for i, node in enumerate(n for n in conv["mapping"].values() if "message" in n):
+        node["message"]["create_time"] = (base + timedelta(seconds=i // 2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    # Exports do not list nodes in thread order.
+    nodes = list(conv["mapping"].items())
+    rng.shuffle(nodes)
+    return {
+        "conversation": {
+            "id": conv["conversation_id"],
+            "title": conv["title"],
+            "create_time": base.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        },
+        "mapping": dict(nodes),
+    }
+
+
+def chatgpt_branched_conversation(rng: random.Random, nodes: int, branch_rate: float = 0.3) -> Dict[str, Any]:
+    """Return a ChatGPT conversation where ``branch_rate`` of the replies are
+    regenerations or edits that start a new branch from an earlier message."""
+    mapping: Dict[str, Any] = {
+        "client-created-root": {"id": "client-created-root", "message": None, "parent": None, "children": []}
+    }
+    keys = ["client-created-root"]
+    parent = "client-created-root"
+    for i in range(nodes):
+        if i and rng.random() < branch_rate:
+            parent = rng.choice(keys)
+        node_id = str(uuid.UUID(int=rng.getrandbits(128)))
+        role = "user" if mapping[parent].get("message") is None or mapping[parent]["message"]["author"]["role"] == "assistant" else "assistant"
+        mapping[node_id] = {
+            "id": node_id,
+            "message": {
+                "id": node_id,
+                "author": {"role": role},
+                "create_time": 1700000000.0 + i,
+                "content": {"content_type": "text", "parts": [sentence(rng)]},
+            },
+            "parent": parent,
+            "children": [],
+        }
+        mapping[parent]["children"].append(node_id)
+        keys.append(node_id)
+        parent = node_id
+    return {
+        "title": "Synthetic branched conversation",
+        "create_time": 1700000000.0,
+        "mapping": mapping,
+        "current_node": parent,
+        "conversation_id": str(uuid.UUID(int=rng.getrandbits(128))),
+    }
+
+
+# Open WebUI's tag table; examples/chat.sql only dumps the chat table.
+TAG_TABLE = (
+    'CREATE TABLE "tag" ("id" VARCHAR(255) NOT NULL, "name" VARCHAR(255) NOT NULL, '
+    '"user_id" VARCHAR(255) NOT NULL, "meta" JSON, PRIMARY KEY ("id", "user_id"));'
+)
+
+
+def webui_fixture_db(path: str, root_dir: str, primary_key: bool = False) -> None:
+    """Create an Open WebUI database at ``path`` from ``examples/chat.sql``.
+
+    The dump has no key on ``chat.id``; ``primary_key`` adds the one that
+    Open WebUI itself declares.
+    """
+    import sqlite3
+
+    with open(os.path.join(root_dir, "examples", "chat.sql"), "r", encoding="utf-8") as fh:
+        # The dump is missing the ';' between the CREATE TABLE and the INSERT.
+        script = fh.read().replace("\nINSERT INTO", ";\nINSERT INTO", 1)
+    if primary_key:
+        script = script.replace('"id" VARCHAR(255) NOT NULL,', '"id" VARCHAR(255) NOT NULL PRIMARY KEY,', 1)
+    conn = sqlite3.connect(path)
+    conn.executescript(script + "\n" + TAG_TABLE)
+    conn.close()
+
+
+def render_sql(inserts: List[str], user_ids: Iterable[str], tags: List[str]) -> str:
+    """Return the whole per-chat SQL script, built in memory as create_sql
+    used to: tag upserts for ``user_ids``, then ``inserts``."""
+    import create_sql
+
+    prefix = []
+    for uid in sorted(user_ids):
+        prefix.extend(create_sql.tag_upserts(uid, tags))
+    return "\n".join(prefix + inserts)
+
+
+def webui_chats(
+    conversations: int, messages: int, seed: int = 0, vocabulary: List[str] = WORDS
+) -> List[Tuple[str, Any]]:
+    """Return ``(file name, data)`` of converted synthetic ChatGPT chats."""
+    import convert_chatgpt
+    import engine
+
+    export = chatgpt_export(conversations, messages, seed, vocabulary)
+    return [
+        engine.render_conversation(convert_chatgpt.PLUGIN, conv, "user")
+        for conv in convert_chatgpt.iter_chatgpt(export)
+    ]
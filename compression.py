@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""On-the-fly compression of converter output and SQL scripts.
+
+Files are compressed while they are written (``--compress gzip|zstd``) and
+decompressed transparently when read, detected from their first bytes.
+gzip comes with Python; zstd needs the optional ``zstandard`` package.
+"""
+
+import io
+from typing import IO
+
+COMPRESSIONS = ("gzip", "zstd")
+SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+# Levels that compress faster than the output can be produced, rather than
+# the slow gzip default of 9.
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd compression needs the zstandard package (pip install zstandard)") from None
+    return zstandard
+
+
+def require(compress: str | None) -> None:
+    """Raise RuntimeError if ``compress`` needs a package that is missing."""
+    if compress == "zstd":
+        _zstandard()
+
+
+def with_suffix(path: str, compress: str | None) -> str:
+    """Return ``path`` with the file suffix of ``compress`` appended."""
+    if not compress:
+        return path
+    suffix = SUFFIXES[compress]
+    return path if path.endswith(suffix) else path + suffix
+
+
+def strip_suffix(path: str) -> str:
+    """Return ``path`` without a compression suffix such as ``.gz``."""
+    for suffix in SUFFIXES.values():
+        if path.endswith(suffix):
+            return path[: -len(suffix)]
+    return path
+
+
+def detect(path: str) -> str | None:
+    """Return the compression of the file at ``path``, or None."""
+    with open(path, "rb") as fh:
+        head = fh.read(4)
+    for magic, name in MAGIC.items():
+        if head.startswith(magic):
+            return name
+    return None
+
+
+def open_write(path: str, compress: str | None = None, text: bool = False) -> IO:
+    """Open ``path`` for writing, compressing with ``compress`` on the fly.
+
+    ``text`` returns a UTF-8 text stream instead of a binary one.
+    """
+    if compress is None:
+        return open(path, "w", encoding="utf-8") if text else open(path, "wb")
+    if compress == "gzip":
+        import gzip
+
+        # mtime=0 keeps the output identical from one run to the next.
+        fh = gzip.GzipFile(path, "wb", compresslevel=GZIP_LEVEL, mtime=0)
+    elif compress == "zstd":
+        zstandard = _zstandard()
+        fh = zstandard.open(path, "wb", cctx=zstandard.ZstdCompressor(level=ZSTD_LEVEL))
+    else:
+        raise ValueError(f"unknown compression '{compress}', expected one of {', '.join(COMPRESSIONS)}")
+    return io.TextIOWrapper(fh, encoding="utf-8") if text else fh
+
+
+def open_read(path: str) -> IO[bytes]:
+    """Open ``path`` for reading bytes, decompressing it if needed."""
+    compress = detect(path)
+    if compress == "gzip":
+        import gzip
+
+        return gzip.open(path, "rb")
+    if compress == "zstd":
+        return io.BufferedReader(_zstandard().open(path, "rb"))
+    return open(path, "rb")
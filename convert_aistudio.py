@@ -1,67 +1,38 @@
 #!/usr/bin/env python3
 """Convert AI Studio exports to open-webui JSON."""
 
-import argparse
 import json
 import os
-import re
 import time
 import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
-
-INVALID_RE = re.compile(r"[\ue000-\uf8ff]")
-
-
-def sanitize_text(text: Any) -> str:
-    """Return ``text`` without private-use Unicode characters."""
-    if not isinstance(text, str):
-        return ""
-    return INVALID_RE.sub("", text)
+from typing import Any, Dict, Iterator, List, Tuple
 
+import engine
+from engine import Message, sanitize_text
+from export_reader import open_export
 
 MODEL = "google/gemini"
 MODEL_NAME = "Gemini"
 SUBDIR = "aistudio"
 
 
-def extract_last_sentence(text: str) -> str:
-    cleaned = text.strip()
-    if not cleaned:
-        return ""
-    matches = re.findall(r"[^.!?]*[.!?]", cleaned, flags=re.DOTALL)
-    if matches:
-        return matches[-1].strip()
-    lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
-    return lines[-1] if lines else cleaned
-
-
-def parse_timestamp(value: Any, default: float) -> float:
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
-        except ValueError:
-            pass
-    return default
-
-
-def parse_aistudio(data: Any, default_title: str = "Untitled") -> List[dict]:
+def iter_aistudio(data: Any, default_title: str = "Untitled") -> Iterator[dict]:
+    """Yield each conversation in ``data`` as soon as it has been parsed."""
     # Handle list of conversations if applicable (though example was a single dict)
     if isinstance(data, list):
-        return [c for item in data for c in parse_aistudio(item, default_title)]
+        for item in data:
+            yield from iter_aistudio(item, default_title)
+        return
         
     if not isinstance(data, dict):
-        return []
-    
-    conversations = []
+        return
     
     # Check for the expected structure
     chunks = data.get("chunkedPrompt", {}).get("chunks", [])
     if not chunks and "conversations" in data:
          # Fallback if it's a different format wrapper
-         return parse_aistudio(data["conversations"], default_title)
+         yield from iter_aistudio(data["conversations"], default_title)
+         return
 
     messages = []
     ts = time.time()  # Default timestamp as none are provided in the schema
@@ -101,87 +72,32 @@ def parse_aistudio(data: Any, default_title: str = "Untitled") -> List[dict]:
         if not clean_text:
             continue
             
-        messages.append((role, clean_text, ts))
+        messages.append(Message(role, clean_text, ts))
 
     # If there's a thought buffer left at the end (no following message)
     if thought_buffer:
         reasoning = sanitize_text(thought_buffer).strip()
         final_thought = f'<details type="reasoning" done="true" duration="0">\n<summary>Thought</summary>\n{reasoning}\n</details>\n'
-        messages.append(("assistant", final_thought, ts))
+        messages.append(Message("assistant", final_thought, ts))
 
     if messages:
-        conversations.append({
+        yield {
             "title": default_title,
             "timestamp": ts,
             "messages": messages,
             "conversation_id": str(uuid.uuid4()),
-        })
-        
-    return conversations
+        }
 
 
-def build_webui(conversation: dict, user_id: str) -> Tuple[Dict[str, Any], str]:
-    conv_uuid = str(uuid.uuid4())
-    messages_map: Dict[str, Any] = {}
-    messages_list: List[Dict[str, Any]] = []
-    prev_id: str | None = None
-    
-    for role, content, ts in conversation["messages"]:
-        msg_id = str(uuid.uuid4())
-        clean = sanitize_text(content)
-        msg = {
-            "id": msg_id,
-            "parentId": prev_id,
-            "childrenIds": [],
-            "role": role,
-            "content": clean,
-            "timestamp": int(ts),
-        }
-        if role == "user":
-            msg["models"] = [MODEL]
-        else:
-            msg.update(
-                {
-                    "model": MODEL,
-                    "modelName": MODEL_NAME,
-                    "modelIdx": 0,
-                    "userContext": None,
-                    "lastSentence": extract_last_sentence(clean),
-                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
-                    "done": True,
-                }
-            )
-        if prev_id:
-            messages_map[prev_id]["childrenIds"].append(msg_id)
-        messages_map[msg_id] = msg
-        messages_list.append(msg)
-        prev_id = msg_id
-        
-    webui = {
-        "id": "",
-        "title": conversation["title"],
-        "models": [MODEL],
-        "params": {},
-        "history": {"messages": messages_map, "currentId": prev_id},
-        "messages": messages_list,
-        "tags": [],
-        "timestamp": int(conversation["timestamp"] * 1000),
-        "files": [],
-    }
-    if user_id:
-        webui["userId"] = user_id
-    return webui, conv_uuid
-
-
-def slugify(text: str) -> str:
-    text = re.sub(r"\s+", "_", text.strip())
-    text = re.sub(r"[^a-zA-Z0-9_\-]", "", text)
-    return text[:50] or "chat"
-
-
-def convert_file(path: str, user_id: str, outdir: str) -> None:
+def parse_aistudio(data: Any, default_title: str = "Untitled") -> List[dict]:
+    """Return every conversation in ``data`` as a list; see :func:`iter_aistudio`."""
+    return list(iter_aistudio(data, default_title))
+
+
+def iter_conversations(path: str, selectors: List[str] | None = None) -> Iterator[dict]:
+    """Yield the parsed conversations of the export at ``path``."""
     try:
-        with open(path, "r", encoding="utf-8") as f:
+        with open_export(path) as f:
             data = json.load(f)
     except Exception as e:
         print(f"Error reading {path}: {e}")
@@ -189,34 +105,31 @@ def convert_file(path: str, user_id: str, outdir: str) -> None:
 
     # Use filename as default title
     filename_title = os.path.splitext(os.path.basename(path))[0]
-    conversations = parse_aistudio(data, default_title=filename_title)
-    
-    os.makedirs(outdir, exist_ok=True)
-    for conv in conversations:
-        out, conv_uuid = build_webui(conv, user_id)
-        conv_id = conv.get("conversation_id")
-        unique = conv_id if conv_id else conv_uuid
-        fname = f"{slugify(conv['title'])}_{unique}.json"
-        
-        output_path = os.path.join(outdir, fname)
-        with open(output_path, "w", encoding="utf-8") as fh:
-            json.dump(out, fh, ensure_ascii=False, indent=2)
-        print(f"Converted: {path} -> {output_path}")
+    yield from iter_aistudio(data, default_title=filename_title)
+
+
+def build_webui(conversation: dict, user_id: str) -> Tuple[Dict[str, Any], str]:
+    return engine.build_webui(conversation, user_id, MODEL, MODEL_NAME)
+
+
+PLUGIN = engine.register(engine.FormatPlugin(
+    name="aistudio",
+    label="AI Studio",
+    model=MODEL,
+    model_name=MODEL_NAME,
+    subdir=SUBDIR,
+    iter_conversations=iter_conversations,
+    selectable=False,
+    log_outputs=True,
+))
+
+
+def convert_file(path: str, user_id: str, outdir: str, workers: int = 1) -> None:
+    engine.convert_file(PLUGIN, path, user_id, outdir, workers=workers)
 
 
 def run_cli() -> None:
-    parser = argparse.ArgumentParser(description="Convert AI Studio exports to open-webui JSON")
-    parser.add_argument("files", nargs="+", help="AI Studio export JSON files")
-    parser.add_argument("--userid", required=True, help="User ID for output files")
-    parser.add_argument("--output-dir", default="output", help="Directory for output JSON files")
-    args = parser.parse_args()
-    
-    outdir = os.path.join(args.output_dir, SUBDIR)
-    for path in args.files:
-        try:
-            convert_file(path, args.userid, outdir)
-        except Exception as exc:
-            print(f"Failed to convert {path}: {exc}")
+    engine.run_cli(PLUGIN)
 
 
 if __name__ == "__main__":
@@ -1,43 +1,19 @@
 #!/usr/bin/env python3
 """Convert ChatGPT exports to open-webui JSON."""
 
-import argparse
-import json
-import os
-import re
-from typing import Any, Dict, List, Tuple
 import time
-import uuid
-from datetime import datetime
+from typing import Any, Dict, Iterator, List, Tuple
 
-INVALID_RE = re.compile(r"[\ue000-\uf8ff]")
-
-
-def sanitize_text(text: Any) -> str:
-    """Return ``text`` without private-use Unicode characters."""
-    if not isinstance(text, str):
-        return ""
-    return INVALID_RE.sub("", text)
+import engine
+from engine import Message, parse_timestamp, sanitize_text
+from export_index import load_selected
+from export_reader import iter_json_items, open_export
 
 MODEL = "openai/GPT-5"
 MODEL_NAME = "OpenAI: GPT-5"
 SUBDIR = "chatgpt"
 
 
-def extract_last_sentence(text: Any) -> str:
-    """Return the last sentence of ``text`` if it is a string."""
-    if not isinstance(text, str):
-        return ""
-    cleaned = text.strip()
-    if not cleaned:
-        return ""
-    matches = re.findall(r"[^.!?]*[.!?]", cleaned, flags=re.DOTALL)
-    if matches:
-        return matches[-1].strip()
-    lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
-    return lines[-1] if lines else cleaned
-
-
 def _parts_to_text(parts: List[Any]) -> str:
     """Return concatenated text from ChatGPT message parts."""
     texts: List[str] = []
@@ -51,21 +27,97 @@ def _parts_to_text(parts: List[Any]) -> str:
     return "".join(texts)
 
 
-def parse_timestamp(value: Any, default: float) -> float:
-    """Convert ``value`` to a Unix timestamp."""
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
-        except ValueError:
-            pass
-    return default
-
-
-def parse_chatgpt(data: Any) -> List[dict]:
+def _node_entry(node: dict, ts: float) -> Message | None:
+    """Return the ``(role, text, timestamp)`` message of a mapping node, if any."""
+    msg = node.get("message") or {}
+    parts = msg.get("content", {}).get("parts", [])
+    if not parts:
+        return None
+    role = msg.get("author", {}).get("role", "assistant")
+    if role not in {"user", "assistant"}:
+        return None
+    text = _parts_to_text(parts)
+    if not text:
+        return None
+    ts_val = msg.get("create_time") or msg.get("timestamp") or ts
+    return Message(role, text, parse_timestamp(ts_val, ts))
+
+
+def _mapping_tree(
+    mapping: Dict[str, Any], current_id: Any, ts: float
+) -> Tuple[List[Message], List[int | None], int | None]:
+    """Return every branch of ``mapping`` as ``(messages, parents, current)``.
+
+    The tree is walked depth-first, visiting children in the order their
+    parent lists them (nodes that only name their ``parent`` come after the
+    listed ones), so each node is visited once however heavily the
+    conversation branches. Nodes without a message (system, tool or empty
+    ones) are skipped and their children attach to the nearest ancestor that
+    has one. The walk starts where the linear import does, at
+    ``client-created-root`` or else a node without a parent, so ``current``
+    follows ``current_node`` and otherwise falls back to the same first
+    branch. Nodes only reachable through a parent cycle are entered at the
+    first of them in the mapping.
+    """
+    nodes = {key: node for key, node in mapping.items() if isinstance(node, dict)}
+    children: Dict[str, List[str]] = {}
+    linked = set()
+    for key, node in nodes.items():
+        kids = node.get("children")
+        if kids and isinstance(kids, list):
+            kids = [kid for kid in kids if kid in nodes and kid != key]
+            children[key] = kids
+            linked.update(kids)
+    for key, node in nodes.items():
+        parent = node.get("parent")
+        if key not in linked and parent in nodes and parent != key:
+            children.setdefault(parent, []).append(key)
+            linked.add(key)
+    # Stable sort: the linear import's root first, then parentless nodes,
+    # then nodes whose parent is missing from the mapping.
+    roots = sorted(
+        (key for key in nodes if key not in linked),
+        key=lambda key: (key != "client-created-root", bool(nodes[key].get("parent"))),
+    )
+
+    messages: List[Message] = []
+    parents: List[int | None] = []
+    current: int | None = None
+    first_leaf: int | None = None
+    visited = set()
+    while len(visited) < len(nodes):
+        if not roots:
+            roots = [next(key for key in nodes if key not in visited)]
+        stack: List[Tuple[str, int | None]] = [(key, None) for key in reversed(roots)]
+        roots = []
+        while stack:
+            key, parent_index = stack.pop()
+            if key in visited:
+                continue
+            visited.add(key)
+            index = parent_index
+            entry = _node_entry(nodes[key], ts)
+            if entry:
+                messages.append(entry)
+                parents.append(parent_index)
+                index = len(messages) - 1
+            if key == current_id:
+                current = index
+            kids = [kid for kid in children.get(key, ()) if kid not in visited]
+            if kids:
+                stack.extend((kid, index) for kid in reversed(kids))
+            elif first_leaf is None:
+                first_leaf = index
+    return messages, parents, first_leaf if current is None else current
+
+
+def iter_chatgpt(data: Any, branches: bool = False) -> Iterator[dict]:
+    """Yield each conversation in ``data`` as soon as it has been parsed.
+
+    With ``branches`` a ``mapping`` conversation keeps every branch (see
+    :func:`_mapping_tree`); otherwise only the current thread is imported.
+    """
     conversations = data if isinstance(data, list) else [data]
-    result = []
     for item in conversations:
         if not isinstance(item, dict):
             continue
@@ -73,7 +125,8 @@ def parse_chatgpt(data: Any) -> List[dict]:
         ts_raw = item.get("create_time") or item.get("update_time") or time.time()
         ts = parse_timestamp(ts_raw, time.time())
         conv_id = item.get("conversation_id") or item.get("id")
-        messages: List[Tuple[str, str, float]] = []
+        messages: List[Message] = []
+        tree: Dict[str, Any] = {}
         if isinstance(item.get("chat_messages"), list):
             for idx, msg in enumerate(item["chat_messages"]):
                 text = msg.get("text")
@@ -82,24 +135,21 @@ def parse_chatgpt(data: Any) -> List[dict]:
                 text = sanitize_text(text)
                 if text:
                     role = "user" if idx % 2 == 0 else "assistant"
-                    messages.append((role, text, ts))
+                    messages.append(Message(role, text, ts))
+        elif branches and isinstance(item.get("mapping"), dict):
+            messages, parents, current = _mapping_tree(item["mapping"], item.get("current_node"), ts)
+            tree = {"parents": parents, "current": current}
         elif isinstance(item.get("mapping"), dict):
             mapping = item["mapping"]
             node = None
             current_id = item.get("current_node")
             if current_id and isinstance(mapping.get(current_id), dict):
                 node = mapping[current_id]
-                stack: List[Tuple[str, str, float]] = []
+                stack: List[Message] = []
                 while isinstance(node, dict):
-                    msg = node.get("message") or {}
-                    parts = msg.get("content", {}).get("parts", [])
-                    if parts:
-                        role = msg.get("author", {}).get("role", "assistant")
-                        if role in {"user", "assistant"}:
-                            ts_val = msg.get("create_time") or msg.get("timestamp") or ts
-                            text = sanitize_text(_parts_to_text(parts))
-                            if text:
-                                stack.append((role, text, parse_timestamp(ts_val, ts)))
+                    entry = _node_entry(node, ts)
+                    if entry:
+                        stack.append(entry)
                     parent_id = node.get("parent")
                     if not parent_id:
                         break
@@ -121,118 +171,70 @@ def parse_chatgpt(data: Any) -> List[dict]:
                         node = mapping.get(next_ids[0])
                         if not isinstance(node, dict):
                             break
-                        msg = node.get("message") or {}
-                        parts = msg.get("content", {}).get("parts", [])
-                        if parts:
-                            role = msg.get("author", {}).get("role", "assistant")
-                            if role in {"user", "assistant"}:
-                                ts_val = msg.get("create_time") or msg.get("timestamp") or ts
-                                text = sanitize_text(_parts_to_text(parts))
-                                if text:
-                                    messages.append((role, text, parse_timestamp(ts_val, ts)))
+                        entry = _node_entry(node, ts)
+                        if entry:
+                            messages.append(entry)
                         next_ids = node.get("children") or []
         else:
-            messages.append(("user", title, ts))
-        result.append({
+            messages.append(Message("user", sanitize_text(title), ts))
+        yield {
             "title": title,
             "timestamp": ts,
             "messages": messages,
             "conversation_id": conv_id,
-        })
-    return result
+            **tree,
+        }
+
+
+def parse_chatgpt(data: Any) -> List[dict]:
+    """Return every conversation in ``data`` as a list; see :func:`iter_chatgpt`."""
+    return list(iter_chatgpt(data))
+
+
+def iter_conversations(
+    path: str, selectors: List[str] | None = None, branches: bool = False
+) -> Iterator[dict]:
+    """Yield the parsed conversations of the export at ``path``."""
+    if selectors:
+        # Decode only the requested conversations via the offset index.
+        yield from iter_chatgpt(load_selected(path, selectors), branches)
+        return
+    # Exports are a top-level array of conversations; decode them one at a
+    # time so memory stays bounded by the largest conversation.
+    with open_export(path) as f:
+        for item in iter_json_items(f):
+            yield from iter_chatgpt([item], branches)
 
 
 def build_webui(conversation: dict, user_id: str) -> Tuple[Dict[str, Any], str]:
-    conv_uuid = str(uuid.uuid4())
-    messages_map: Dict[str, Any] = {}
-    messages_list: List[Dict[str, Any]] = []
-    prev_id: str | None = None
-    for role, content, ts in conversation["messages"]:
-        msg_id = str(uuid.uuid4())
-        clean = sanitize_text(content)
-        msg = {
-            "id": msg_id,
-            "parentId": prev_id,
-            "childrenIds": [],
-            "role": role,
-            "content": clean,
-            "timestamp": int(ts),
-        }
-        if role == "user":
-            msg["models"] = [MODEL]
-        else:
-            msg.update(
-                {
-                    "model": MODEL,
-                    "modelName": MODEL_NAME,
-                    "modelIdx": 0,
-                    "userContext": None,
-                    "lastSentence": extract_last_sentence(clean),
-                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
-                    "done": True,
-                }
-            )
-        if prev_id:
-            messages_map[prev_id]["childrenIds"].append(msg_id)
-        messages_map[msg_id] = msg
-        messages_list.append(msg)
-        prev_id = msg_id
-    webui = {
-        "id": "",
-        "title": conversation["title"],
-        "models": [MODEL],
-        "params": {},
-        "history": {"messages": messages_map, "currentId": prev_id},
-        "messages": messages_list,
-        "tags": [],
-        "timestamp": int(conversation["timestamp"] * 1000),
-        "files": [],
-    }
-    if user_id:
-        webui["userId"] = user_id
-    return webui, conv_uuid
-
-
-def slugify(text: Any) -> str:
-    if not isinstance(text, str):
-        text = str(text)
-    text = re.sub(r"\s+", "_", text.strip())
-    text = re.sub(r"[^a-zA-Z0-9_\-]", "", text)
-    return text[:50] or "chat"
-
-
-def convert_file(path: str, user_id: str, outdir: str) -> None:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    conversations = parse_chatgpt(data)
-    os.makedirs(outdir, exist_ok=True)
-    for conv in conversations:
-        out, conv_uuid = build_webui(conv, user_id)
-        conv_id = conv.get("conversation_id")
-        unique = conv_id if conv_id else conv_uuid
-        fname = f"{slugify(conv['title'])}_{unique}.json"
-        outer = {
-            "id": "",
-            "user_id": user_id,
-            "title": conv.get("title", ""),
-            "chat": out
-        }
-        with open(os.path.join(outdir, fname), "w", encoding="utf-8") as fh:
-            json.dump([outer], fh, ensure_ascii=False, indent=2)
+    return engine.build_webui(conversation, user_id, MODEL, MODEL_NAME)
+
+
+PLUGIN = engine.register(engine.FormatPlugin(
+    name="chatgpt",
+    label="ChatGPT",
+    model=MODEL,
+    model_name=MODEL_NAME,
+    subdir=SUBDIR,
+    iter_conversations=iter_conversations,
+    wrap_output=True,
+    branchable=True,
+))
+
+
+def convert_file(
+    path: str,
+    user_id: str,
+    outdir: str,
+    selectors: List[str] | None = None,
+    workers: int = 1,
+    branches: bool = False,
+) -> None:
+    engine.convert_file(PLUGIN, path, user_id, outdir, selectors, workers, branches)
 
 
 def run_cli() -> None:
-    parser = argparse.ArgumentParser(description="Convert ChatGPT exports to open-webui JSON")
-    parser.add_argument("files", nargs="+", help="ChatGPT export JSON files")
-    parser.add_argument("--userid", required=True, help="User ID for output files")
-    parser.add_argument("--output-dir", default="output", help="Directory for output JSON files")
-    args = parser.parse_args()
-    outdir = os.path.join(args.output_dir, SUBDIR)
-    for path in args.files:
-        try:
-            convert_file(path, args.userid, outdir)
-        except Exception as exc:
-            print(f"Failed to convert {path}: {exc}")
+    engine.run_cli(PLUGIN)
 
 
 if __name__ == "__main__":
@@ -1,54 +1,155 @@
 #!/usr/bin/env python3
 """Convert Grok exports to open-webui JSON."""
 
-import argparse
-import json
-import os
-import re
 import time
-import uuid
-from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Tuple
 
-INVALID_RE = re.compile(r"[\ue000-\uf8ff]")
-
-
-def sanitize_text(text: Any) -> str:
-    """Return ``text`` without private-use Unicode characters."""
-    if not isinstance(text, str):
-        return ""
-    return INVALID_RE.sub("", text)
+import engine
+from engine import Message, parse_timestamp, sanitize_text
+from export_index import load_selected
+from export_reader import iter_json_items, open_export
 
 MODEL = "x-ai/grok-4"
 MODEL_NAME = "Grok 4"
 SUBDIR = "grok"
 
 
-def extract_last_sentence(text: str) -> str:
-    cleaned = text.strip()
-    if not cleaned:
-        return ""
-    matches = re.findall(r"[^.!?]*[.!?]", cleaned, flags=re.DOTALL)
-    if matches:
-        return matches[-1].strip()
-    lines = [ln.strip() for ln in cleaned.splitlines() if ln.strip()]
-    return lines[-1] if lines else cleaned
-
-
-def parse_timestamp(value: Any, default: float) -> float:
-    if isinstance(value, (int, float)):
-        return float(value)
-    if isinstance(value, str):
-        try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
-        except ValueError:
-            pass
-    return default
-
-
-def parse_grok(data: Any) -> List[dict]:
+ROOT_ID = "client-created-root"
+
+
+def _node_message(node: Any) -> dict:
+    msg = node.get("message") if isinstance(node, dict) else None
+    return msg if isinstance(msg, dict) else {}
+
+
+def _node_time(node: dict, ts: float) -> float:
+    msg = node.get("message")
+    if not isinstance(msg, dict):
+        return ts
+    return parse_timestamp(msg.get("create_time") or msg.get("timestamp"), ts)
+
+
+def _tree_order(mapping: Dict[str, Any], ts: float) -> List[dict] | None:
+    """Return the nodes of a well-formed ``mapping`` in thread order.
+
+    Well formed means that the nodes whose parent is missing are the only
+    ones no node lists as a child, and that every other node is listed
+    exactly once, as Grok writes them. The walk then needs no index of the
+    links; ``None`` is returned once the mapping turns out otherwise.
+    """
+    root = mapping.get(ROOT_ID)
+    parent = root.get("parent") if isinstance(root, dict) else ROOT_ID
+    if parent != ROOT_ID and parent not in mapping:
+        # The usual export: if the walk from the root reaches every node,
+        # no other node can be a root, so they need not be looked for.
+        roots = [ROOT_ID]
+    else:
+        roots = []
+        for key, node in mapping.items():
+            parent = node.get("parent") if isinstance(node, dict) else key
+            if parent != key and parent not in mapping:
+                roots.append(key)
+        roots.sort(key=lambda key: _node_time(mapping[key], ts))
+    order: List[dict] = []
+    visited: List[str] = []
+    stack = roots[::-1]
+    while stack:
+        key = stack.pop()
+        node = mapping.get(key)
+        if not isinstance(node, dict):
+            continue
+        if len(visited) == len(mapping):
+            # A node was reached twice, possibly round a cycle.
+            return None
+        visited.append(key)
+        order.append(node)
+        kids = node.get("children")
+        if kids and isinstance(kids, list):
+            if len(kids) == 1:
+                stack.append(kids[0])
+            else:
+                stack.extend(reversed(kids))
+    if len(visited) != len(mapping) or len(set(visited)) != len(mapping):
+        return None
+    return order
+
+
+def _linked_order(mapping: Dict[str, Any], ts: float) -> List[dict]:
+    """Return the nodes of any ``mapping`` in thread order.
+
+    Nodes listed by no other node hang under the parent they name, after its
+    listed children, or else become roots. Whatever the roots do not reach
+    is only reachable through a cycle, which is entered at its earliest node.
+    """
+    # The children to visit, in stack (reversed) order, for every node.
+    children: Dict[str, List[str]] = {}
+    linked = set()
+    for key, node in mapping.items():
+        if not isinstance(node, dict):
+            continue
+        kids = node.get("children")
+        if kids and isinstance(kids, list):
+            children[key] = kids[::-1]
+            linked.update(kids)
+        else:
+            children[key] = []
+    for key in [key for key in children if key not in linked]:
+        parent = mapping[key].get("parent")
+        if parent in children and parent != key:
+            children[parent].insert(0, key)
+            linked.add(key)
+
+    def node_time(key: str) -> float:
+        return _node_time(mapping[key], ts)
+
+    roots = sorted((key for key in children if key not in linked), key=node_time)
+    order: List[dict] = []
+    stack: List[str] = []
+    while children:
+        stack.extend(reversed(roots or [min(children, key=node_time)]))
+        roots = []
+        while stack:
+            key = stack.pop()
+            # Popping from ``children`` marks the node visited.
+            kids = children.pop(key, None)
+            if kids is not None:
+                order.append(mapping[key])
+                stack.extend(kids)
+    return order
+
+
+def _mapping_messages(mapping: Dict[str, Any], ts: float) -> List[Message]:
+    """Return the messages of a ``mapping`` conversation in thread order.
+
+    The parent/children links are walked depth-first from each root, visiting
+    children in the order they are listed, so every node is placed in O(n)
+    and messages with equal timestamps keep their thread order. Nodes whose
+    parent is missing become roots of their own, and roots are ordered by
+    timestamp; a mapping without any links therefore falls back to plain
+    timestamp order. A well-formed mapping is walked as it is, and only
+    other mappings pay for indexing their links (:func:`_linked_order`).
+    """
+    order = _tree_order(mapping, ts)
+    if order is None:
+        order = _linked_order(mapping, ts)
+    root_node = mapping.get(ROOT_ID)
+    messages: List[Message] = []
+    for node in order:
+        msg = node.get("message")
+        if node is root_node or not isinstance(msg, dict):
+            continue
+        parts = msg.get("content", {}).get("parts", [])
+        if parts:
+            role = msg.get("author", {}).get("role", "assistant")
+            node_ts = parse_timestamp(msg.get("create_time") or msg.get("timestamp"), ts)
+            messages.append(Message(role, sanitize_text(parts[0]), node_ts))
+    return messages
+
+
+def iter_grok(data: Any) -> Iterator[dict]:
+    """Yield each conversation in ``data`` as soon as it has been parsed."""
     convs = data.get("conversations") if isinstance(data, dict) and "conversations" in data else [data]
-    result = []
     for item in convs:
         obj = item.get("conversation", item)
         title = obj.get("title") or "Untitled"
@@ -57,140 +158,80 @@ def parse_grok(data: Any) -> List[dict]:
         conv_id = obj.get("conversation_id") or obj.get("id")
         mapping = item.get("mapping") or obj.get("mapping") or data.get("mapping")
         responses = item.get("responses")
-        messages: List[Tuple[str, str, float]] = []
+        messages: List[Message] = []
         if isinstance(responses, list):
-            def sort_key(resp: Any) -> float:
-                ts_val = resp.get("response", {}).get("create_time")
-                return parse_timestamp(ts_val, ts)
-
-            responses_sorted = sorted(
-                [r for r in responses if isinstance(r, dict)], key=sort_key
-            )
-            for resp in responses_sorted:
-                inner = resp.get("response", {})
+            # Parse each time once and reuse it as both sort key and message time.
+            timed = []
+            for resp in responses:
+                if isinstance(resp, dict):
+                    inner = resp.get("response", {})
+                    timed.append((parse_timestamp(inner.get("create_time"), ts), inner))
+            timed.sort(key=itemgetter(0))
+            for resp_ts, inner in timed:
                 text = inner.get("message")
                 text = sanitize_text(text)
                 if not text:
                     continue
                 sender = inner.get("sender") or "assistant"
                 role = "user" if str(sender).lower() == "human" else "assistant"
-                ts_val = inner.get("create_time")
-                messages.append((role, text, parse_timestamp(ts_val, ts)))
+                messages.append(Message(role, text, resp_ts))
         elif isinstance(mapping, dict):
-            root_node = mapping.get("client-created-root")
+            root_node = mapping.get(ROOT_ID)
             if isinstance(root_node, dict):
-                part = root_node.get("message", {}).get("content", {}).get("parts", [])
+                part = _node_message(root_node).get("content", {}).get("parts", [])
                 if part:
-                    messages.append(("user", sanitize_text(part[0]), ts))
-            other_nodes = [v for k, v in mapping.items() if k != "client-created-root"]
-
-            def sort_key(node: Any) -> float:
-                ts_val = node.get("message", {}).get("create_time") or node.get("message", {}).get("timestamp")
-                return parse_timestamp(ts_val, ts)
-
-            other_nodes.sort(key=sort_key)
-            for node in other_nodes:
-                if not isinstance(node, dict):
-                    continue
-                msg = node.get("message", {})
-                parts = msg.get("content", {}).get("parts", [])
-                if not parts:
-                    continue
-                role = msg.get("author", {}).get("role", "assistant")
-                ts_val = msg.get("create_time") or msg.get("timestamp") or ts
-                messages.append((role, sanitize_text(parts[0]), parse_timestamp(ts_val, ts)))
-        result.append({
+                    messages.append(Message("user", sanitize_text(part[0]), ts))
+            messages.extend(_mapping_messages(mapping, ts))
+        yield {
             "title": title,
             "timestamp": ts,
             "messages": messages,
             "conversation_id": conv_id,
-        })
-    return result
+        }
+
+
+def parse_grok(data: Any) -> List[dict]:
+    """Return every conversation in ``data`` as a list; see :func:`iter_grok`."""
+    return list(iter_grok(data))
+
+
+def iter_conversations(path: str, selectors: List[str] | None = None) -> Iterator[dict]:
+    """Yield the parsed conversations of the export at ``path``."""
+    if selectors:
+        # Decode only the requested conversations via the offset index.
+        yield from iter_grok({"conversations": load_selected(path, selectors)})
+        return
+    with open_export(path) as f:
+        for item in iter_json_items(f, keys=("conversations",)):
+            yield from iter_grok({"conversations": [item]})
 
 
 def build_webui(conversation: dict, user_id: str) -> Tuple[Dict[str, Any], str]:
-    conv_uuid = str(uuid.uuid4())
-    messages_map: Dict[str, Any] = {}
-    messages_list: List[Dict[str, Any]] = []
-    prev_id: str | None = None
-    for role, content, ts in conversation["messages"]:
-        msg_id = str(uuid.uuid4())
-        clean = sanitize_text(content)
-        msg = {
-            "id": msg_id,
-            "parentId": prev_id,
-            "childrenIds": [],
-            "role": role,
-            "content": clean,
-            "timestamp": int(ts),
-        }
-        if role == "user":
-            msg["models"] = [MODEL]
-        else:
-            msg.update(
-                {
-                    "model": MODEL,
-                    "modelName": MODEL_NAME,
-                    "modelIdx": 0,
-                    "userContext": None,
-                    "lastSentence": extract_last_sentence(clean),
-                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
-                    "done": True,
-                }
-            )
-        if prev_id:
-            messages_map[prev_id]["childrenIds"].append(msg_id)
-        messages_map[msg_id] = msg
-        messages_list.append(msg)
-        prev_id = msg_id
-    webui = {
-        "id": "",
-        "title": conversation["title"],
-        "models": [MODEL],
-        "params": {},
-        "history": {"messages": messages_map, "currentId": prev_id},
-        "messages": messages_list,
-        "tags": [],
-        "timestamp": int(conversation["timestamp"] * 1000),
-        "files": [],
-    }
-    if user_id:
-        webui["userId"] = user_id
-    return webui, conv_uuid
-
-
-def slugify(text: str) -> str:
-    text = re.sub(r"\s+", "_", text.strip())
-    text = re.sub(r"[^a-zA-Z0-9_\-]", "", text)
-    return text[:50] or "chat"
-
-
-def convert_file(path: str, user_id: str, outdir: str) -> None:
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-    conversations = parse_grok(data)
-    os.makedirs(outdir, exist_ok=True)
-    for conv in conversations:
-        out, conv_uuid = build_webui(conv, user_id)
-        conv_id = conv.get("conversation_id")
-        unique = conv_id if conv_id else conv_uuid
-        fname = f"{slugify(conv['title'])}_{unique}.json"
-        with open(os.path.join(outdir, fname), "w", encoding="utf-8") as fh:
-            json.dump(out, fh, ensure_ascii=False, indent=2)
+    return engine.build_webui(conversation, user_id, MODEL, MODEL_NAME)
+
+
+PLUGIN = engine.register(engine.FormatPlugin(
+    name="grok",
+    label="Grok",
+    model=MODEL,
+    model_name=MODEL_NAME,
+    subdir=SUBDIR,
+    iter_conversations=iter_conversations,
+))
+
+
+def convert_file(
+    path: str,
+    user_id: str,
+    outdir: str,
+    selectors: List[str] | None = None,
+    workers: int = 1,
+) -> None:
+    engine.convert_file(PLUGIN, path, user_id, outdir, selectors, workers)
 
 
 def run_cli() -> None:
-    parser = argparse.ArgumentParser(description="Convert Grok exports to open-webui JSON")
-    parser.add_argument("files", nargs="+", help="Grok export JSON files")
-    parser.add_argument("--userid", required=True, help="User ID for output files")
-    parser.add_argument("--output-dir", default="output", help="Directory for output JSON files")
-    args = parser.parse_args()
-    outdir = os.path.join(args.output_dir, SUBDIR)
-    for path in args.files:
-        try:
-            convert_file(path, args.userid, outdir)
-        except Exception as exc:
-            print(f"Failed to convert {path}: {exc}")
+    engine.run_cli(PLUGIN)
 
 
 if __name__ == "__main__":
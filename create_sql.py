@@ -3,24 +3,103 @@
 import argparse
 import json
 import os
-import uuid
+import sys
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator, TextIO
+
+# compression, json_backend, shutil, tempfile and uuid are imported where
+# they are used, which keeps them out of the start-up time of the command.
+
+# Suffix of the one-chat-per-line files written by ``--bundle``.
+BUNDLE_SUFFIX = ".jsonl"
+# Chat statements are held in memory up to this size, then spooled to disk.
+SPOOL_SIZE = 16 * 1024 * 1024
+
+# (id, user_id, title, created_at, chat, meta), as built by chat_row
+ChatRow = tuple[str, str, str, int, str, str]
 
 
 def load_json(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    import json_backend
+
+    return json_backend.load(path)
+
+
+def load_chat_file(path: str) -> tuple[str, Any]:
+    """Return the file name and chat stored in the file ``path``."""
+    return path, load_json(path)
+
+
+def load_bundle_line(line: bytes) -> tuple[str, Any]:
+    """Return the file name and chat stored in one line of a bundle."""
+    import json_backend
+
+    record = json_backend.loads(line)
+    return record["name"], record["data"]
+
+
+def read_chat_file(path: str) -> tuple[str, str]:
+    """Return the file name and undecoded JSON text of the file ``path``."""
+    import compression
+
+    with compression.open_read(path) as fh:
+        return path, fh.read().decode("utf-8")
+
+
+def read_bundle_line(line: bytes) -> tuple[str, str]:
+    """Return the file name and undecoded chat JSON of one line of a bundle.
+
+    Only the name is decoded: ``--bundle`` writes it before the chat, which
+    is the rest of the line.
+    """
+    text = line.decode("utf-8").rstrip()
+    try:
+        record, start = leading_members(text, 0, ("data",))
+        if isinstance(record.get("name"), str) and text.endswith("}"):
+            return record["name"], text[start:-1]
+    except ValueError:
+        pass
+    import json_backend
+
+    name, data = load_bundle_line(line)
+    return name, json_backend.dumps(data, compact=True).decode("utf-8")
 
 
 def escape_sql_string(value: str) -> str:
     return value.replace("'", "''")
 
 
-def build_meta(tags: list[str]) -> str:
-    meta = json.dumps({"tags": tags}, ensure_ascii=True)
-    return escape_sql_string(meta)
+import re
 
+# Lone UTF-16 surrogates: json.loads accepts them from escapes such as
+# "\ud83d", but they cannot be encoded as UTF-8.
+SURROGATES = re.compile("[\ud800-\udfff]")
+
+
+def dump_json(value: Any, utf8: bool = False) -> str:
+    """Return ``value`` as JSON for a SQL column.
+
+    By default every non-ASCII character is escaped as ``\\uXXXX``. With
+    ``utf8`` they are written as UTF-8, which is two to three times smaller
+    for emoji and CJK text; only lone surrogates are still escaped.
+    """
+    if not utf8:
+        return json.dumps(value, ensure_ascii=True)
+    text = json.dumps(value, ensure_ascii=False)
+    try:
+        text.encode("utf-8")
+    except UnicodeEncodeError:
+        # Surrogates only occur inside JSON strings, where the escape is valid.
+        text = SURROGATES.sub(lambda m: f"\\u{ord(m.group()):04x}", text)
+    return text
 
-import re
+
+def meta_json(tags: list[str], utf8: bool = False) -> str:
+    return dump_json({"tags": tags}, utf8)
+
+
+def build_meta(tags: list[str]) -> str:
+    return escape_sql_string(meta_json(tags))
 
 
 def slugify(value: str) -> str:
@@ -30,8 +109,8 @@ def slugify(value: str) -> str:
     return re.sub(r"-+", "-", value).strip("-")
 
 
-def tag_upserts(user_id: str, meta_tags: list[str]) -> list[str]:
-    """Return SQL statements to ensure tags exist for the user."""
+def tag_rows(user_id: str, meta_tags: list[str]) -> list[tuple[str, str]]:
+    """Return the ``(id, name)`` of every tag to ensure for the user."""
     base_tags = [
         ("imported-grok", "imported-grok"),
         ("imported-chatgpt", "imported-chatgpt"),
@@ -44,9 +123,13 @@ def tag_upserts(user_id: str, meta_tags: list[str]) -> list[str]:
     unique: dict[str, str] = {}
     for tag_id, name in base_tags:
         unique[tag_id] = name
+    return list(unique.items())
+
 
+def tag_upserts(user_id: str, meta_tags: list[str]) -> list[str]:
+    """Return SQL statements to ensure tags exist for the user."""
     stmts = []
-    for tag_id, name in unique.items():
+    for tag_id, name in tag_rows(user_id, meta_tags):
         stmts.append(
             'INSERT INTO "main"."tag" ("id","name","user_id","meta") '
             f"VALUES ('{tag_id}','{name}','{user_id}','null') "
@@ -55,8 +138,16 @@ def tag_upserts(user_id: str, meta_tags: list[str]) -> list[str]:
     return stmts
 
 def json_to_sql(path: str, tags: list[str]) -> tuple[str, str]:
-    data = load_json(path)
+    return chat_to_sql(load_json(path), path, tags)
+
 
+def chat_row(data: Any, path: str, tags: list[str], utf8: bool = False) -> ChatRow:
+    """Return ``(id, user_id, title, created_at, chat, meta)`` for a chat.
+
+    ``data`` was loaded from the file ``path``, whose name carries the chat
+    id. The values are unquoted, ready to be bound as SQL parameters.
+    ``utf8`` writes the JSON columns as UTF-8 (see :func:`dump_json`).
+    """
     if isinstance(data, list):
         # new format produced by convert_chatgpt.py: a list with a single object
         data = data[0]
@@ -72,74 +163,352 @@ def json_to_sql(path: str, tags: list[str]) -> tuple[str, str]:
     if not user_id:
         raise ValueError(f"userId missing in {path}")
 
-    chat_json = json.dumps(data, ensure_ascii=True)
-    chat_json = escape_sql_string(chat_json)
+    chat_json = dump_json(data, utf8)
 
-    title = escape_sql_string(data.get("title", ""))
+    title = data.get("title", "")
     timestamp_ms = data.get("timestamp", 0)
     created_at = int(int(timestamp_ms) / 1000)
 
-    base = os.path.splitext(os.path.basename(path))[0]
+    return chat_id_from_path(path), user_id, title, created_at, chat_json, meta_json(tags, utf8)
+
+
+def chat_id_from_path(path: str) -> str:
+    """Return the chat id carried by the file name ``path``, or a new one."""
+    import compression
+    import uuid
+
+    base = os.path.splitext(compression.strip_suffix(os.path.basename(path)))[0]
     possible_id = base.split("_")[-1]
     try:
         uuid.UUID(possible_id)
-        record_id = possible_id
+        return possible_id
+    except ValueError:
+        return str(uuid.uuid4())
+
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# The end of a chat built by engine.build_webui: its timestamp, files and
+# optional userId are the last members of the top-level object.
+_CHAT_TAIL = re.compile(
+    r'"timestamp":\s*(-?\d+)\s*,\s*"files":\s*\[\]\s*(?:,\s*"userId":\s*("(?:[^"\\]|\\.)*")\s*)?\}\Z'
+)
+# How far from the end of a chat _CHAT_TAIL is looked for.
+TAIL_SIZE = 1024
+
+
+def leading_members(text: str, pos: int, stop: tuple[str, ...]) -> tuple[dict, int]:
+    """Decode the members of the JSON object at ``pos`` up to a key in ``stop``.
+
+    Returns the members before that key and the index where its value
+    starts, without decoding the value or anything after it. Raises
+    ``ValueError`` if the object ends or is malformed before a ``stop`` key.
+    """
+    pos = _WHITESPACE.match(text, pos).end()
+    if text[pos : pos + 1] != "{":
+        raise ValueError("expected an object")
+    members = {}
+    pos += 1
+    while True:
+        key, pos = _decoder.raw_decode(text, _WHITESPACE.match(text, pos).end())
+        pos = _WHITESPACE.match(text, pos).end()
+        if not isinstance(key, str) or text[pos : pos + 1] != ":":
+            raise ValueError("expected a key")
+        pos = _WHITESPACE.match(text, pos + 1).end()
+        if key in stop:
+            return members, pos
+        members[key], pos = _decoder.raw_decode(text, pos)
+        pos = _WHITESPACE.match(text, pos).end()
+        if text[pos : pos + 1] != ",":
+            raise ValueError(f"no {' or '.join(stop)} member")
+        pos += 1
+
+
+def raw_chat_row(
+    text: str, path: str, tags: list[str], utf8: bool = False
+) -> ChatRow | None:
+    """Return the :func:`chat_row` of the JSON ``text`` without decoding the chat.
+
+    The few values the row needs are read from the start of the document
+    and the end of the chat, and the chat's text is used as it is, so the
+    messages are never decoded and encoded again. This works for compact
+    converter output (``--compact`` files and bundles); for any other
+    shape, indented JSON, or non-ASCII text without ``utf8``, None is
+    returned and the caller falls back to :func:`chat_row`.
+    """
+    text = text.rstrip()
+    if "\n" in text or not (utf8 or text.isascii()):
+        return None
+    try:
+        if text.startswith("["):
+            # [{"id": ..., "user_id": ..., "title": ..., "chat": {...}}]
+            wrapper, start = leading_members(text, 1, ("chat",))
+            end = text[:-1].rstrip()
+            if not (text.endswith("]") and end.endswith("}")):
+                return None
+            chat_json = end[start:-1].rstrip()
+            user_id = wrapper.get("user_id")
+        else:
+            chat_json = text
+            user_id = None
+        header, _ = leading_members(chat_json, 0, ("history", "messages"))
+        tail = _CHAT_TAIL.search(chat_json, max(0, len(chat_json) - TAIL_SIZE))
+        if tail is None or "title" not in header:
+            return None
+        if not text.startswith("[") and tail.group(2):
+            user_id = json.loads(tail.group(2))
+        if not user_id:
+            return None
     except ValueError:
-        record_id = str(uuid.uuid4())
+        return None
+    created_at = int(int(tail.group(1)) / 1000)
+    return chat_id_from_path(path), user_id, header["title"], created_at, chat_json, meta_json(tags, utf8)
+
+
+CHAT_COLUMNS = (
+    "id", "user_id", "title", "share_id", "archived", "created_at",
+    "updated_at", "chat", "pinned", "meta", "folder_id",
+)
+
+
+def chat_values(row: ChatRow) -> str:
+    """Return the quoted ``VALUES`` tuple for a :func:`chat_row`."""
+    record_id, user_id, title, created_at, chat_json, meta = row
+    title = escape_sql_string(title)
+    chat_json = escape_sql_string(chat_json)
+    meta = escape_sql_string(meta)
+    return f"('{record_id}','{user_id}','{title}',NULL,0,{created_at},{created_at},'{chat_json}',0,'{meta}',NULL)"
 
-    meta = build_meta(tags)
 
-    sql = (
-        f"DELETE FROM \"main\".\"chat\" WHERE \"id\" = '{record_id}';\n"
+def delete_insert_sql(row: ChatRow) -> str:
+    """Return the DELETE and INSERT that replace the chat of a :func:`chat_row`."""
+    return (
+        f"DELETE FROM \"main\".\"chat\" WHERE \"id\" = '{row[0]}';\n"
         "INSERT INTO \"main\".\"chat\" "
         "(\"id\",\"user_id\",\"title\",\"share_id\",\"archived\",\"created_at\",\"updated_at\",\"chat\",\"pinned\",\"meta\",\"folder_id\")\n"
-        f"VALUES ('{record_id}','{user_id}','{title}',NULL,0,{created_at},{created_at},'{chat_json}',0,'{meta}',NULL);"
+        f"VALUES {chat_values(row)};"
     )
-    return sql, user_id
+
+
+def chat_to_sql(data: Any, path: str, tags: list[str]) -> tuple[str, str]:
+    """Return the SQL for a chat loaded from the file ``path``."""
+    row = chat_row(data, path, tags)
+    return delete_insert_sql(row), row[1]
+
+
+def chat_upsert_sql(rows: list[ChatRow]) -> str:
+    """Return one multi-row ``INSERT ... ON CONFLICT`` for the chats in ``rows``.
+
+    The conflict target needs ``chat.id`` to be the primary key, as it is in
+    Open WebUI's schema.
+    """
+    columns = ",".join(f'"{c}"' for c in CHAT_COLUMNS)
+    updates = ",".join(f'"{c}"=excluded."{c}"' for c in CHAT_COLUMNS[1:])
+    values = ",\n".join(chat_values(row) for row in rows)
+    return (
+        f'INSERT INTO "main"."chat" ({columns}) VALUES\n{values}\n'
+        f'ON CONFLICT("id") DO UPDATE SET {updates};'
+    )
+
+
+def tag_upsert_batch(user_ids: Iterable[str], tags: list[str]) -> list[str]:
+    """Return a multi-row tag upsert for ``user_ids``, or nothing without users."""
+    tag_values = [
+        f"('{tag_id}','{name}','{uid}','null')"
+        for uid in sorted(user_ids)
+        for tag_id, name in tag_rows(uid, tags)
+    ]
+    if not tag_values:
+        return []
+    return [
+        'INSERT INTO "main"."tag" ("id","name","user_id","meta") VALUES\n'
+        + ",\n".join(tag_values)
+        + '\nON CONFLICT("id","user_id") DO UPDATE SET "name"=excluded."name";'
+    ]
+
+
+class ScriptWriter:
+    """Write a SQL script while its chats are still being produced.
+
+    The tag upserts at the top of the script depend on the users of every
+    chat, so chat statements are spooled to a temporary file (kept in memory
+    up to ``SPOOL_SIZE``) and copied after the tags once all chats are in.
+    Memory use stays flat however many chats there are.
+
+    With ``upsert_batch`` the script is one transaction of multi-row upserts
+    of that many chats; otherwise each chat gets a DELETE and an INSERT.
+    """
+
+    def __init__(self, tags: list[str], upsert_batch: int | None = None) -> None:
+        import tempfile
+
+        self.tags = tags
+        self.upsert_batch = upsert_batch
+        self.user_ids: set[str] = set()
+        self.pending: list[ChatRow] = []
+        self.body = tempfile.SpooledTemporaryFile(SPOOL_SIZE, "w+", encoding="utf-8")
+
+    def add(self, row: ChatRow) -> None:
+        """Add the chat of a :func:`chat_row` to the script."""
+        self.user_ids.add(row[1])
+        if not self.upsert_batch:
+            self.body.write(delete_insert_sql(row) + "\n")
+            return
+        self.pending.append(row)
+        if len(self.pending) >= self.upsert_batch:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self.pending:
+            self.body.write(chat_upsert_sql(self.pending) + "\n")
+            self.pending = []
+
+    def write_to(self, out: TextIO) -> None:
+        """Write the whole script to ``out`` and release the spooled chats."""
+        self._flush()
+        if self.upsert_batch:
+            header = ["BEGIN;", *tag_upsert_batch(self.user_ids, self.tags)]
+        else:
+            header = [stmt for uid in sorted(self.user_ids) for stmt in tag_upserts(uid, self.tags)]
+        for stmt in header:
+            out.write(stmt + "\n")
+        import shutil
+
+        self.body.seek(0)
+        shutil.copyfileobj(self.body, out)
+        if self.upsert_batch:
+            out.write("COMMIT;\n")
+        self.body.close()
 
 
 def gather_files(paths: list[str]) -> list[str]:
+    import compression
+
     result = []
     for p in paths:
         if os.path.isdir(p):
             for name in os.listdir(p):
-                if name.endswith('.json'):
+                if compression.strip_suffix(name).endswith(('.json', BUNDLE_SUFFIX)):
                     result.append(os.path.join(p, name))
         else:
             result.append(p)
     return result
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Create SQL inserts for open-webui chats")
-    parser.add_argument("files", nargs="+", help="Chat JSON files or directories")
-    parser.add_argument("--tags", default="imported", help="Comma-separated tags for the meta field")
-    parser.add_argument("--output", help="Write SQL statements to this file")
-    args = parser.parse_args()
+def iter_chats(files: list[str], raw: bool = False) -> Iterator[tuple[str, Callable[[], tuple[str, Any]]]]:
+    """Yield ``(source, load)`` for every chat in ``files``.
 
-    tags = [t.strip() for t in args.tags.split(',') if t.strip()] or ["imported"]
+    ``load()`` returns the chat's file name and data, or with ``raw`` its
+    undecoded JSON text. Bundles are read one line at a time, so they are
+    never held in memory as a whole.
+    """
+    import compression
 
-    files = gather_files(args.files)
-    inserts = []
-    user_ids: set[str] = set()
-    for fpath in files:
+    load_file, load_line = (read_chat_file, read_bundle_line) if raw else (load_chat_file, load_bundle_line)
+    for path in files:
+        if not compression.strip_suffix(path).endswith(BUNDLE_SUFFIX):
+            yield path, partial(load_file, path)
+            continue
+        with compression.open_read(path) as fh:
+            for lineno, line in enumerate(fh, 1):
+                if line.strip():
+                    yield f"{path}:{lineno}", partial(load_line, line)
+
+
+def iter_rows(
+    files: list[str], tags: list[str], utf8: bool = False, raw: bool = False
+) -> Iterator[ChatRow]:
+    """Yield the :func:`chat_row` of every chat in ``files``.
+
+    With ``raw`` each chat's JSON text is used as it is when
+    :func:`raw_chat_row` can, and decoded otherwise.
+    """
+    for source, load in iter_chats(files, raw):
         try:
-            sql, uid = json_to_sql(fpath, tags)
-            inserts.append(sql)
-            user_ids.add(uid)
+            name, data = load()
+            if raw:
+                row = raw_chat_row(data, name, tags, utf8)
+                if row is None:
+                    import json_backend
+
+                    row = chat_row(json_backend.loads(data), name, tags, utf8)
+                yield row
+                continue
+            yield chat_row(data, name, tags, utf8)
         except Exception as exc:
-            raise SystemExit(f"Failed to process {fpath}: {exc}")
+            raise SystemExit(f"Failed to process {source}: {exc}")
+
+
+def main(argv: list[str] | None = None, prog: str | None = None) -> None:
+    import compression
 
-    prefix = []
-    for uid in sorted(user_ids):
-        prefix.extend(tag_upserts(uid, tags))
+    parser = argparse.ArgumentParser(prog=prog, description="Create SQL inserts for open-webui chats")
+    parser.add_argument("files", nargs="+", help="Chat JSON files, .jsonl bundles or directories")
+    parser.add_argument("--tags", default="imported", help="Comma-separated tags for the meta field")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--output", help="Write SQL statements to this file")
+    target.add_argument("--sqlite", metavar="DB", help="Import the chats straight into this Open WebUI SQLite database")
+    parser.add_argument("--batch-size", type=int, help="Chats per transaction with --sqlite (default: 10000, 100 with --online)")
+    parser.add_argument("--online", action="store_true", help="With --sqlite, import into a database that Open WebUI is using: small transactions, waiting and retrying while it is busy")
+    parser.add_argument("--busy-timeout", type=int, default=2000, metavar="MS", help="With --online, how long each transaction waits for the write lock before backing off (default: 2000)")
+    parser.add_argument("--max-transaction-ms", type=float, default=100, metavar="MS", help="With --online, shrink batches to keep each write transaction under this (default: 100)")
+    parser.add_argument("--upsert-batch", type=int, metavar="N", help="Write multi-row INSERT ... ON CONFLICT upserts of N chats in one transaction instead of DELETE and INSERT per chat (needs chat.id to be the primary key, as in Open WebUI)")
+    parser.add_argument("--format", choices=("sqlite", "pg-copy"), default="sqlite", help="Script flavour: SQLite INSERTs, or a psql script that loads the chats with PostgreSQL COPY (default: sqlite)")
+    parser.add_argument("--utf8", action="store_true", help="Write non-ASCII text in the chat JSON as UTF-8 instead of \\uXXXX escapes")
+    parser.add_argument("--raw", action="store_true", help="Copy the chat JSON of compact files and bundles into the SQL as it is instead of decoding and re-encoding it")
+    parser.add_argument("--compress", choices=compression.COMPRESSIONS, help="Compress the --output file while writing it (zstd needs the zstandard package)")
+    args = parser.parse_args(argv)
+    try:
+        compression.require(args.compress)
+    except RuntimeError as exc:
+        parser.error(str(exc))
+    if args.online and not args.sqlite:
+        parser.error("--online requires --sqlite")
+    if args.compress and not args.output:
+        parser.error("--compress requires --output")
+    if args.upsert_batch is not None and (args.sqlite or args.upsert_batch < 1):
+        parser.error("--upsert-batch takes a positive number and cannot be used with --sqlite")
+    if args.format == "pg-copy" and (args.sqlite or args.upsert_batch is not None):
+        parser.error("--format pg-copy cannot be used with --sqlite or --upsert-batch")
 
-    output = "\n".join(prefix + inserts)
+    tags = [t.strip() for t in args.tags.split(',') if t.strip()] or ["imported"]
+
+    files = gather_files(args.files)
+    if args.sqlite:
+        import sqlite_import
+
+        rows = iter_rows(files, tags, args.utf8, args.raw)
+        if args.online:
+            stats = sqlite_import.import_chats_online(
+                args.sqlite,
+                rows,
+                tags,
+                args.batch_size or sqlite_import.ONLINE_BATCH_SIZE,
+                args.max_transaction_ms,
+                args.busy_timeout,
+            )
+            print(
+                f"Imported {stats.chats} chats into {args.sqlite} in {stats.transactions} transactions "
+                f"(longest {stats.longest_ms:.0f} ms, {stats.retries} retries while busy)"
+            )
+            return
+        count = sqlite_import.import_chats(args.sqlite, rows, tags, args.batch_size or sqlite_import.BATCH_SIZE)
+        print(f"Imported {count} chats into {args.sqlite}")
+        return
+
+    if args.format == "pg-copy":
+        import pg_copy
+
+        writer = pg_copy.CopyWriter(tags)
+    else:
+        writer = ScriptWriter(tags, args.upsert_batch)
+    for row in iter_rows(files, tags, args.utf8, args.raw):
+        writer.add(row)
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
-            f.write(output + "\n")
+        with compression.open_write(compression.with_suffix(args.output, args.compress), args.compress, text=True) as f:
+            writer.write_to(f)
     else:
-        print(output)
+        writer.write_to(sys.stdout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""Shared conversion engine for turning chat exports into open-webui JSON.
+
+Each source format lives in its own ``convert_<name>.py`` module, which parses
+the export and registers a :class:`FormatPlugin`. Everything after parsing
+(message building, serialisation, file writing and the worker pool) is
+implemented once here and shared by all formats.
+"""
+
+import argparse
+import importlib
+import os
+import re
+import uuid
+from datetime import datetime
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+import compression
+import json_backend
+from export_reader import open_export
+from parallel import imap_ordered
+
+INVALID_RE = re.compile(r"[\ue000-\uf8ff]")
+
+# Formats that ship with the importer, each provided by ``convert_<name>.py``.
+FORMAT_NAMES = ("aistudio", "chatgpt", "claude", "grok")
+
+SNIFF_SIZE = 64 * 1024
+# Object keys that identify each format, checked in this order. Only keys are
+# matched (a quoted name followed by a colon), so message text that mentions
+# one of these words cannot trigger a false match.
+FORMAT_MARKERS = (
+    ("aistudio", ("chunkedPrompt",)),
+    ("grok", ("responses", "modify_time")),
+    ("chatgpt", ("mapping", "current_node", "create_time")),
+    ("claude", ("chat_messages", "sender")),
+)
+_MARKER_RES = [
+    (name, re.compile(r'(?<!\\)"(?:%s)"\s*:' % "|".join(keys)))
+    for name, keys in FORMAT_MARKERS
+]
+
+
+def sanitize_text(text: Any) -> str:
+    """Return ``text`` without private-use Unicode characters."""
+    if not isinstance(text, str):
+        return ""
+    # ASCII text cannot contain private-use characters, and str.isascii() is
+    # O(1), so the common case skips the regex scan entirely.
+    if text.isascii():
+        return text
+    return INVALID_RE.sub("", text)
+
+
+def _last_line(text: str) -> str:
+    """Return the last non-blank line of ``text`` without splitting all of it."""
+    cleaned = text.strip()
+    window = 256
+    while True:
+        tail = cleaned[-window:]
+        lines = tail.splitlines()
+        # A line that starts inside the window is complete once another line
+        # boundary precedes it, or once the window covers the whole string.
+        if len(lines) > 1 or len(tail) == len(cleaned):
+            return lines[-1].strip() if lines else ""
+        window *= 4
+
+
+def extract_last_sentence(text: Any) -> str:
+    """Return the last sentence of ``text`` if it is a string.
+
+    A sentence runs up to and including a ``.``, ``!`` or ``?``; the last one
+    is found by scanning backward from the end of the text, so long messages
+    are not split into every sentence just to keep the final one.
+    """
+    if not isinstance(text, str):
+        return ""
+    end = max(text.rfind("."), text.rfind("!"), text.rfind("?"))
+    if end < 0:
+        return _last_line(text)
+    start = max(text.rfind(".", 0, end), text.rfind("!", 0, end), text.rfind("?", 0, end))
+    return text[start + 1:end + 1].strip()
+
+
+def parse_iso_timestamp(value: str) -> float | None:
+    """Return the Unix timestamp of an ISO-8601 string, or ``None`` if invalid."""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def parse_timestamp(value: Any, default: float) -> float:
+    """Convert ``value`` to a Unix timestamp."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        parsed = parse_iso_timestamp(value)
+        if parsed is not None:
+            return parsed
+    return default
+
+
+def slugify(text: Any) -> str:
+    if not isinstance(text, str):
+        text = str(text)
+    text = re.sub(r"\s+", "_", text.strip())
+    text = re.sub(r"[^a-zA-Z0-9_\-]", "", text)
+    return text[:50] or "chat"
+
+
+class Message(NamedTuple):
+    """A parsed message; a plain tuple underneath, so it costs no more memory."""
+
+    role: str
+    content: str
+    timestamp: float
+
+
+# How each chat stores its messages (``--layout``). "full" stores every
+# message twice, as Open WebUI does: in the ``history`` tree and, for the
+# current branch, in the ``messages`` list; it is the layout for current
+# versions. "history" leaves the list empty: chats still load from the tree,
+# but Open WebUI's message search reads only the list, so they are found by
+# title alone until Open WebUI saves them again. "list" leaves out the tree
+# for old versions that only read the list (newer ones rebuild the tree from
+# it, keeping the current branch only).
+LAYOUTS = ("full", "history", "list")
+
+
+class FormatPlugin(NamedTuple):
+    """A source export format and how its conversations are written."""
+
+    name: str
+    label: str
+    model: str
+    model_name: str
+    subdir: str
+    # ``iter_conversations(path, selectors)`` yields parsed conversations whose
+    # messages are :class:`Message` records with already sanitized text.
+    # A conversation with several branches also has ``parents`` (the index of
+    # each message's parent, which always comes earlier, or ``None``) and
+    # ``current`` (the index of the message the thread currently ends on).
+    iter_conversations: Callable[..., Iterator[dict]]
+    # Write ``[{"id", "user_id", "title", "chat"}]`` instead of the bare chat.
+    wrap_output: bool = False
+    # Whether ``--id`` selection is supported.
+    selectable: bool = True
+    # Print a line for every file written.
+    log_outputs: bool = False
+    # Whether ``iter_conversations`` accepts ``branches=True`` (``--branches``).
+    branchable: bool = False
+
+
+FORMATS: Dict[str, FormatPlugin] = {}
+
+
+def register(plugin: FormatPlugin) -> FormatPlugin:
+    """Add ``plugin`` to the registry and return it."""
+    FORMATS[plugin.name] = plugin
+    return plugin
+
+
+def get_format(name: str) -> FormatPlugin:
+    """Return the plugin for ``name``, importing ``convert_<name>`` on demand."""
+    if name not in FORMATS:
+        try:
+            importlib.import_module(f"convert_{name}")
+        except ModuleNotFoundError as exc:
+            # Only a missing converter means an unknown format; a converter
+            # that fails to import is a bug to report as it is.
+            if exc.name != f"convert_{name}":
+                raise
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise ValueError(f"Unknown export format: {name}") from None
+
+
+def detect_format(path: str, sniff_size: int = SNIFF_SIZE) -> str | None:
+    """Return the export format of ``path``, or ``None`` if it is not recognised.
+
+    Only the first ``sniff_size`` characters are read (from the conversations
+    member for ZIP archives), so detection costs a small prefix read rather
+    than a second full decode of the export.
+    """
+    try:
+        with open_export(path) as fh:
+            head = fh.read(sniff_size)
+    except Exception:
+        # Unreadable, binary or corrupt archive: not an export we recognise.
+        return None
+    for name, marker_re in _MARKER_RES:
+        if marker_re.search(head):
+            return name
+    return None
+
+
+def build_webui(
+    conversation: dict, user_id: str, model: str, model_name: str, layout: str = "full"
+) -> Tuple[Dict[str, Any], str]:
+    conv_uuid = str(uuid.uuid4())
+    messages_map: Dict[str, Any] = {}
+    messages_list: List[Dict[str, Any]] = []
+    parents = conversation.get("parents")
+    ids: List[str] = []
+    prev_id: str | None = None
+    for index, (role, content, ts) in enumerate(conversation["messages"]):
+        msg_id = str(uuid.uuid4())
+        if parents is not None:
+            parent = parents[index]
+            prev_id = None if parent is None else ids[parent]
+            ids.append(msg_id)
+        # Each dict is built in one literal (not extended with update()), so
+        # it is allocated at its final size.
+        if role == "user":
+            msg = {
+                "id": msg_id,
+                "parentId": prev_id,
+                "childrenIds": [],
+                "role": role,
+                "content": content,
+                "timestamp": int(ts),
+                "models": [model],
+            }
+        else:
+            msg = {
+                "id": msg_id,
+                "parentId": prev_id,
+                "childrenIds": [],
+                "role": role,
+                "content": content,
+                "timestamp": int(ts),
+                "model": model,
+                "modelName": model_name,
+                "modelIdx": 0,
+                "userContext": None,
+                "lastSentence": extract_last_sentence(content),
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                "done": True,
+            }
+        if prev_id:
+            siblings = messages_map[prev_id]["childrenIds"]
+            if siblings:
+                siblings.append(msg_id)
+            else:
+                # A one-item list literal is smaller than an appended-to list.
+                messages_map[prev_id]["childrenIds"] = [msg_id]
+        messages_map[msg_id] = msg
+        messages_list.append(msg)
+        prev_id = msg_id
+    if parents is not None:
+        # ``messages`` is only the current branch: walk up from its last message.
+        current = conversation.get("current")
+        prev_id = None if current is None else ids[current]
+        messages_list = []
+        msg_id = prev_id
+        while msg_id:
+            messages_list.append(messages_map[msg_id])
+            msg_id = messages_map[msg_id]["parentId"]
+        messages_list.reverse()
+    webui = {
+        "id": "",
+        "title": conversation["title"],
+        "models": [model],
+        "params": {},
+        "history": {"messages": messages_map, "currentId": prev_id},
+        "messages": [] if layout == "history" else messages_list,
+        "tags": [],
+        "timestamp": int(conversation["timestamp"] * 1000),
+        "files": [],
+    }
+    if layout == "list":
+        del webui["history"]
+    if user_id:
+        webui["userId"] = user_id
+    return webui, conv_uuid
+
+
+def render_conversation(plugin: FormatPlugin, conv: dict, user_id: str, layout: str = "full") -> Tuple[str, Any]:
+    """Build ``conv`` and return its output file name and JSON document.
+
+    ``layout`` is one of :data:`LAYOUTS`.
+    """
+    out, conv_uuid = build_webui(conv, user_id, plugin.model, plugin.model_name, layout)
+    conv_id = conv.get("conversation_id")
+    unique = conv_id if conv_id else conv_uuid
+    fname = f"{slugify(conv['title'])}_{unique}.json"
+    if plugin.wrap_output:
+        out = [{
+            "id": "",
+            "user_id": user_id,
+            "title": conv.get("title", ""),
+            "chat": out
+        }]
+    return fname, out
+
+
+def write_conversation(
+    plugin: FormatPlugin,
+    conv: dict,
+    user_id: str,
+    outdir: str,
+    compact: bool = False,
+    compress: str | None = None,
+    layout: str = "full",
+) -> str:
+    """Build ``conv`` and write it to ``outdir``, returning the output path.
+
+    ``compact`` drops the indentation, which makes the file smaller and
+    faster to write and to re-read in ``create_sql.py``. ``compress``
+    (``"gzip"`` or ``"zstd"``) compresses the file while it is written and
+    adds the matching suffix, e.g. ``.json.gz``. ``layout`` is one of
+    :data:`LAYOUTS`.
+    """
+    fname, out = render_conversation(plugin, conv, user_id, layout)
+    out_path = compression.with_suffix(os.path.join(outdir, fname), compress)
+    json_backend.dump(out, out_path, compact, compress)
+    return out_path
+
+
+def bundle_line(plugin: FormatPlugin, conv: dict, user_id: str, layout: str = "full") -> Tuple[str, bytes]:
+    """Build ``conv`` and return its file name and one line of a bundle.
+
+    A bundle holds one ``{"name": ..., "data": ...}`` object per line, where
+    ``name`` and ``data`` are the file name and content that
+    :func:`write_conversation` would have written.
+    """
+    fname, out = render_conversation(plugin, conv, user_id, layout)
+    return fname, json_backend.dumps({"name": fname, "data": out}, compact=True) + b"\n"
+
+
+# A conversation handed to a worker: (plugin, conversation, user id, source path).
+Job = Tuple[FormatPlugin, dict, str, str]
+
+
+def _write_job(
+    job: Job, output_dir: str, compact: bool, compress: str | None, layout: str, subdir: bool = True
+) -> Tuple[str, str, bool]:
+    plugin, conv, user_id, source = job
+    outdir = os.path.join(output_dir, plugin.subdir) if subdir else output_dir
+    return source, write_conversation(plugin, conv, user_id, outdir, compact, compress, layout), plugin.log_outputs
+
+
+def _bundle_job(job: Job, layout: str) -> Tuple[str, str, bytes, bool]:
+    plugin, conv, user_id, source = job
+    return (source, *bundle_line(plugin, conv, user_id, layout), plugin.log_outputs)
+
+
+class JobFailure(NamedTuple):
+    """A conversation that could not be converted, reported by its source."""
+
+    source: str
+    error: str
+
+
+def _run_job(func: Callable[[Job], Any], job: Job) -> Any:
+    # The error is returned as text rather than raised, so one bad
+    # conversation does not stop the run and the result always pickles
+    # back from a worker.
+    try:
+        return func(job)
+    except Exception as exc:
+        return JobFailure(job[3], str(exc))
+
+
+def _map_jobs(func: Callable[[Job], Any], jobs: Iterable[Job], workers: int) -> Iterator[Any]:
+    """Yield ``func(job)`` for every job in order, reporting and skipping failures."""
+    for result in imap_ordered(partial(_run_job, func), jobs, workers):
+        if isinstance(result, JobFailure):
+            print(f"Failed to convert {result.source}: {result.error}")
+            continue
+        yield result
+
+
+def _iter_conversations(
+    plugin: FormatPlugin, path: str, selectors: List[str] | None, branches: bool
+) -> Iterator[dict]:
+    if branches and plugin.branchable:
+        return plugin.iter_conversations(path, selectors, branches=True)
+    return plugin.iter_conversations(path, selectors)
+
+
+def convert_file(
+    plugin: FormatPlugin,
+    path: str,
+    user_id: str,
+    outdir: str,
+    selectors: List[str] | None = None,
+    workers: int = 1,
+    branches: bool = False,
+    compact: bool = False,
+    compress: str | None = None,
+    layout: str = "full",
+) -> List[str]:
+    """Convert the export at ``path`` and return the paths written.
+
+    A conversation that fails to convert is reported and skipped, as in
+    :func:`map_conversations`.
+    """
+    os.makedirs(outdir, exist_ok=True)
+    write = partial(_write_job, output_dir=outdir, compact=compact, compress=compress, layout=layout, subdir=False)
+    jobs = ((plugin, conv, user_id, path) for conv in _iter_conversations(plugin, path, selectors, branches))
+    written = []
+    for _, out_path, log in _map_jobs(write, jobs, workers):
+        if log:
+            print(f"Converted: {path} -> {out_path}")
+        written.append(out_path)
+    return written
+
+
+def map_conversations(
+    func: Callable[[Job], Any],
+    inputs: Iterable[Tuple[str, FormatPlugin]],
+    user_id: str,
+    selectors: List[str] | None = None,
+    workers: int = 1,
+    branches: bool = False,
+) -> Iterator[Any]:
+    """Yield ``func(job)`` for every conversation in ``inputs``, in order.
+
+    ``inputs`` are ``(path, plugin)`` pairs of any mix of formats, and every
+    conversation is passed to ``func`` as a :data:`Job` in a pool of
+    ``workers`` processes, so ``func`` must be a picklable module-level
+    function. A file that fails to parse, or a conversation that ``func``
+    fails on, is reported with its source path and skipped; the rest are
+    still converted.
+    """
+
+    def jobs() -> Iterator[Job]:
+        for path, plugin in inputs:
+            try:
+                wanted = selectors if plugin.selectable else None
+                for conv in _iter_conversations(plugin, path, wanted, branches):
+                    yield plugin, conv, user_id, path
+            except Exception as exc:
+                print(f"Failed to convert {path}: {exc}")
+
+    return _map_jobs(func, jobs(), workers)
+
+
+def convert_files(
+    inputs: Iterable[Tuple[str, FormatPlugin]],
+    user_id: str,
+    output_dir: str,
+    selectors: List[str] | None = None,
+    workers: int = 1,
+    branches: bool = False,
+    compact: bool = False,
+    bundle: str | None = None,
+    compress: str | None = None,
+    layout: str = "full",
+) -> List[str]:
+    """Convert ``(path, plugin)`` pairs of any mix of formats in one pool.
+
+    Each format writes to its own subdirectory of ``output_dir``.
+    ``branches`` keeps every branch for the formats that support it,
+    ``compact`` writes the JSON without indentation, ``compress``
+    compresses every file written and ``layout`` picks how each chat stores
+    its messages (see :func:`write_conversation`).
+
+    With ``bundle`` every conversation is written as one line of that file
+    (see :func:`bundle_line`) instead of to a file of its own, and the names
+    of the bundled conversations are returned.
+    """
+    inputs = list(inputs)
+
+    def conversations(func: Callable[[Job], Any]) -> Iterator[Any]:
+        return map_conversations(func, inputs, user_id, selectors, workers, branches)
+
+    written = []
+    if bundle:
+        bundle = compression.with_suffix(bundle, compress)
+        os.makedirs(os.path.dirname(os.path.abspath(bundle)), exist_ok=True)
+        with compression.open_write(bundle, compress) as fh:
+            for source, name, line, log in conversations(partial(_bundle_job, layout=layout)):
+                fh.write(line)
+                if log:
+                    print(f"Converted: {source} -> {bundle}:{name}")
+                written.append(name)
+        return written
+    for subdir in dict.fromkeys(plugin.subdir for _, plugin in inputs):
+        os.makedirs(os.path.join(output_dir, subdir), exist_ok=True)
+    write = partial(_write_job, output_dir=output_dir, compact=compact, compress=compress, layout=layout)
+    for source, out_path, log in conversations(write):
+        if log:
+            print(f"Converted: {source} -> {out_path}")
+        written.append(out_path)
+    return written
+
+
+def run_cli(
+    plugin: FormatPlugin | None = None,
+    argv: List[str] | None = None,
+    prog: str | None = None,
+) -> None:
+    """Command line entry point for converting exports.
+
+    With ``plugin`` this is the CLI of a ``convert_<name>.py`` script;
+    without it the format of each file comes from ``--type`` (detected per
+    file by default), as used by ``openwebui-import convert``.
+    """
+    label = plugin.label if plugin else "chat"
+    parser = argparse.ArgumentParser(prog=prog, description=f"Convert {label} exports to open-webui JSON")
+    parser.add_argument("files", nargs="+", help=f"{label} export JSON files")
+    parser.add_argument("--userid", required=True, help="User ID for output files")
+    parser.add_argument("--output-dir", default="output", help="Directory for output JSON files")
+    parser.add_argument("--workers", type=int, default=1, help="Convert conversations in this many processes")
+    if plugin is None:
+        parser.add_argument("--type", default="auto", choices=["auto", *FORMAT_NAMES], help="Export format (default: auto, detected per file)")
+    if plugin is None or plugin.selectable:
+        parser.add_argument("--id", dest="ids", action="append", help="Only convert the conversation with this ID or title (repeatable)")
+    if plugin is None or plugin.branchable:
+        parser.add_argument("--branches", action="store_true", help="Import every branch (regenerated and edited messages), not only the current one")
+    parser.add_argument("--compact", action="store_true", help="Write JSON without indentation")
+    parser.add_argument("--bundle", metavar="FILE", help="Write every conversation as one line of this JSONL file instead of one file each")
+    parser.add_argument("--compress", choices=compression.COMPRESSIONS, help="Compress the output files while writing them (zstd needs the zstandard package)")
+    parser.add_argument("--layout", choices=LAYOUTS, default="full", help="Store messages in both the history tree and the list (full, the default, for current Open WebUI); history drops the list, which Open WebUI searches for message text; list drops the tree, for old versions")
+    args = parser.parse_args(argv)
+    try:
+        compression.require(args.compress)
+    except RuntimeError as exc:
+        parser.error(str(exc))
+
+    inputs = []
+    for path in args.files:
+        if plugin is not None:
+            inputs.append((path, plugin))
+            continue
+        fmt = detect_format(path) if args.type == "auto" else args.type
+        if fmt is None:
+            print(f"Failed to convert {path}: unrecognised export format")
+            continue
+        inputs.append((path, get_format(fmt)))
+    convert_files(
+        inputs,
+        args.userid,
+        args.output_dir,
+        args.ids if "ids" in args else None,
+        args.workers,
+        args.branches if "branches" in args else False,
+        args.compact,
+        args.bundle,
+        args.compress,
+        args.layout,
+    )
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Sidecar byte-offset index for conversations inside an export file."""
+
+import argparse
+import json
+import mmap
+import os
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple
+
+from export_reader import is_zip, iter_json_items, iter_json_spans, open_export
+
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 1
+# Top-level keys that wrap the conversation array in Claude and Grok exports.
+EXPORT_KEYS = ("chats", "conversations")
+
+Entry = Tuple[str | None, str | None, int, int]
+
+
+def conversation_key(item: Any) -> Tuple[str | None, str | None]:
+    """Return the ``(id, title)`` of an exported conversation object."""
+    if not isinstance(item, dict):
+        return None, None
+    obj = item.get("conversation")
+    if not isinstance(obj, dict):
+        obj = item
+    conv_id = obj.get("conversation_id") or obj.get("uuid") or obj.get("id") or item.get("uuid")
+    title = obj.get("title") or obj.get("name") or item.get("name")
+    return (
+        str(conv_id) if conv_id else None,
+        title if isinstance(title, str) else None,
+    )
+
+
+def _file_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class ExportIndex:
+    """Byte spans of the conversations in ``path``, cached next to the file.
+
+    The index is built with one streaming pass over the export and stored in
+    ``<path>.idx``; it is rebuilt whenever the export's size or
+    modification time changes. Conversations are then decoded lazily from a
+    memory map of the export, so loading a few of them costs O(selected)
+    rather than O(export size).
+    """
+
+    def __init__(self, path: str, keys: Sequence[str] = EXPORT_KEYS) -> None:
+        self.path = path
+        self.keys = tuple(keys)
+        self.index_path = path + INDEX_SUFFIX
+        entries = self._load()
+        self.entries: List[Entry] = self.build() if entries is None else entries
+
+    def _load(self) -> List[Entry] | None:
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != INDEX_VERSION
+            or data.get("keys") != list(self.keys)
+            or data.get("stamp") != _file_stamp(self.path)
+        ):
+            return None
+        return [tuple(e) for e in data.get("entries", [])]
+
+    def build(self) -> List[Entry]:
+        """Scan the export, write the sidecar index and return its entries."""
+        entries: List[Entry] = []
+        with open(self.path, "r", encoding="utf-8", newline="") as fh:
+            for item, start, end in iter_json_spans(fh, keys=self.keys):
+                conv_id, title = conversation_key(item)
+                entries.append((conv_id, title, start, end))
+        data = {
+            "version": INDEX_VERSION,
+            "keys": list(self.keys),
+            "stamp": _file_stamp(self.path),
+            "entries": entries,
+        }
+        try:
+            with open(self.index_path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+        except OSError:
+            # A read-only export directory only loses the cache, not the index.
+            pass
+        self.entries = entries
+        return entries
+
+    def find(self, selectors: Iterable[str]) -> List[Entry]:
+        """Return entries whose id or title matches one of ``selectors``."""
+        wanted = set(selectors)
+        return [e for e in self.entries if e[0] in wanted or e[1] in wanted]
+
+    def load(self, selectors: Iterable[str]) -> Iterator[Any]:
+        """Decode and yield only the conversations matching ``selectors``."""
+        entries = self.find(selectors)
+        if not entries:
+            return
+        with open(self.path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for _, _, start, end in entries:
+                    yield json.loads(mm[start:end])
+
+
+def load_selected(path: str, selectors: Iterable[str], keys: Sequence[str] = EXPORT_KEYS) -> List[Any]:
+    """Return the conversations in ``path`` whose id or title is in ``selectors``."""
+    if not is_zip(path):
+        return list(ExportIndex(path, keys).load(selectors))
+    # Archive members cannot be memory-mapped, so filter while streaming.
+    wanted = set(selectors)
+    with open_export(path) as fh:
+        return [
+            item for item in iter_json_items(fh, keys=keys)
+            if not wanted.isdisjoint(conversation_key(item))
+        ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the conversation offset index for export files")
+    parser.add_argument("files", nargs="+", help="Export JSON files")
+    args = parser.parse_args()
+    for path in args.files:
+        index = ExportIndex(path)
+        print(f"{index.index_path}: {len(index.entries)} conversations")
+
+
+if __name__ == "__main__":
+    main()
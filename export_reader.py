@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Incremental readers for large chat export files."""
+
+import io
+import json
+import os
+import re
+from contextlib import contextmanager
+from typing import IO, TYPE_CHECKING, Any, Iterator, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import zipfile
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = " \t\n\r"
+# Characters that may still continue a JSON number, up to the buffer end.
+NUMBER_TAIL = re.compile(r"[0-9eE.+-]*\Z")
+# Archive members holding the conversations in ChatGPT, Claude and Grok exports.
+EXPORT_MEMBERS = ("conversations.json", "prod-grok-backend.json")
+ZIP_MAGIC = b"PK\x03\x04"
+
+
+def is_zip(path: str) -> bool:
+    """Return ``True`` if ``path`` starts with a ZIP local file header."""
+    with open(path, "rb") as fh:
+        return fh.read(len(ZIP_MAGIC)) == ZIP_MAGIC
+
+
+def find_export_member(zf: "zipfile.ZipFile") -> str:
+    """Return the name of the conversations JSON inside an export archive."""
+    names = [n for n in zf.namelist() if not n.endswith("/")]
+    for wanted in EXPORT_MEMBERS:
+        for name in names:
+            if os.path.basename(name) == wanted:
+                return name
+    json_names = [n for n in names if n.lower().endswith(".json")]
+    if len(json_names) == 1:
+        return json_names[0]
+    raise ValueError(f"No conversations JSON found in {zf.filename}")
+
+
+@contextmanager
+def open_export(path: str) -> Iterator[IO[str]]:
+    """Open an export as UTF-8 text, streaming the JSON member out of a ZIP.
+
+    ZIP archives are read member-first without extracting anything to disk.
+    """
+    if is_zip(path):
+        # Imported on demand: zipfile is slow to import and most inputs are JSON.
+        import zipfile
+
+        with zipfile.ZipFile(path) as zf:
+            with zf.open(find_export_member(zf)) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8")
+    else:
+        with open(path, "r", encoding="utf-8") as fh:
+            yield fh
+
+
+class _Scanner:
+    """Buffered view over a text stream that decodes one JSON value at a time."""
+
+    def __init__(self, fh: IO[str], chunk_size: int, track_bytes: bool) -> None:
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = fh.read(chunk_size)
+        self.pos = 1 if self.buf.startswith("\ufeff") else 0
+        self.eof = not self.buf
+        self.track_bytes = track_bytes
+        # Byte offset of ``buf[anchor]`` in the underlying UTF-8 file.
+        self.anchor = 0
+        self.anchor_byte = 0
+
+    def byte_offset(self, index: int) -> int:
+        """Return the file byte offset of ``buf[index]`` (``index >= anchor``)."""
+        if not self.track_bytes:
+            return 0
+        self.anchor_byte += len(self.buf[self.anchor:index].encode("utf-8"))
+        self.anchor = index
+        return self.anchor_byte
+
+    def read_more(self, size: int) -> None:
+        chunk = self.fh.read(size)
+        if not chunk:
+            self.eof = True
+            return
+        self.byte_offset(self.pos)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.anchor = 0
+
+    def peek(self) -> str | None:
+        """Skip whitespace and return the next character, or ``None`` at EOF."""
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if self.eof:
+                return None
+            self.read_more(self.chunk_size)
+
+    def expect(self, char: str, message: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(message, self.buf, self.pos)
+        self.pos += 1
+
+    def decode(self) -> Tuple[Any, int, int]:
+        """Decode the value at the cursor, returning it with its byte span."""
+        if self.peek() is None:
+            raise json.JSONDecodeError("Expecting value", self.buf, self.pos)
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.read_more(max(self.chunk_size, len(self.buf) - self.pos))
+                continue
+            # A number cut by the buffer edge still decodes, as a shorter
+            # number ("1.5" read up to "1." gives 1), so read on while what
+            # follows it could be more of the number.
+            if (
+                not self.eof
+                and type(value) in (int, float)
+                and NUMBER_TAIL.match(self.buf, end)
+            ):
+                self.read_more(self.chunk_size)
+                continue
+            break
+        start = self.byte_offset(self.pos)
+        stop = self.byte_offset(end)
+        self.pos = end
+        return value, start, stop
+
+    def rest(self) -> Tuple[Any, int, int]:
+        """Decode everything from the cursor to EOF as one value."""
+        start = self.byte_offset(self.pos)
+        text = self.buf[self.pos:] + self.fh.read()
+        value = json.loads(text)
+        stop = start + len(text.encode("utf-8")) if self.track_bytes else 0
+        return value, start, stop
+
+
+def _iter_array(scanner: _Scanner) -> Iterator[Tuple[Any, int, int]]:
+    scanner.expect("[", "Expecting '['")
+    if scanner.peek() == "]":
+        scanner.pos += 1
+        return
+    while True:
+        yield scanner.decode()
+        char = scanner.peek()
+        if char == "]":
+            scanner.pos += 1
+            return
+        if char != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", scanner.buf, scanner.pos)
+        scanner.pos += 1
+
+
+def _iter_spans(scanner: _Scanner, keys: Sequence[str]) -> Iterator[Tuple[Any, int, int]]:
+    char = scanner.peek()
+    if char is None:
+        raise json.JSONDecodeError("Expecting value", scanner.buf, scanner.pos)
+    if char == "[":
+        yield from _iter_array(scanner)
+        return
+    if char != "{" or not keys:
+        yield scanner.rest()
+        return
+
+    # Walk the members of a top-level object until one of ``keys`` holds an
+    # array. Members seen on the way are kept so an object without any of the
+    # keys can still be yielded whole.
+    start = scanner.byte_offset(scanner.pos)
+    scanner.pos += 1
+    members: dict = {}
+    if scanner.peek() != "}":
+        while True:
+            name, _, _ = scanner.decode()
+            scanner.expect(":", "Expecting ':' delimiter")
+            if name in keys and scanner.peek() == "[":
+                yield from _iter_array(scanner)
+                return
+            members[name], _, _ = scanner.decode()
+            char = scanner.peek()
+            if char == "}":
+                break
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", scanner.buf, scanner.pos)
+            scanner.pos += 1
+    scanner.pos += 1
+    yield members, start, scanner.byte_offset(scanner.pos)
+
+
+def iter_json_spans(
+    fh: IO[str], chunk_size: int = CHUNK_SIZE, keys: Sequence[str] = ()
+) -> Iterator[Tuple[Any, int, int]]:
+    """Yield ``(item, start, end)`` for each item of the export in ``fh``.
+
+    ``start`` and ``end`` are byte offsets into the UTF-8 file, so ``fh`` must
+    be opened with ``encoding="utf-8"`` and ``newline=""``.
+    """
+    return _iter_spans(_Scanner(fh, chunk_size, True), keys)
+
+
+def iter_json_items(
+    fh: IO[str], chunk_size: int = CHUNK_SIZE, keys: Sequence[str] = ()
+) -> Iterator[Any]:
+    """Yield the conversations of the export in ``fh`` one at a time.
+
+    Items come from the top-level array, or from the array stored under any
+    of ``keys`` in a top-level object. Only the text of the item
+    currently being decoded is buffered, so peak memory follows the largest
+    item rather than the whole file. Any other top-level value is decoded in
+    full and yielded as a single item.
+    """
+    for item, _, _ in _iter_spans(_Scanner(fh, chunk_size, False), keys):
+        yield item
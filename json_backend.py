@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""JSON encoding and decoding with an optional fast backend.
+
+`orjson <https://github.com/ijl/orjson>`_ is used when it is installed and
+the standard library ``json`` module otherwise. Both produce the same bytes
+for converter output: UTF-8 text, two-space indentation and ``": "``
+separators, or no whitespace at all in compact mode.
+"""
+
+import importlib.util
+import json
+from typing import Any, Callable, Dict
+
+import compression
+
+
+def _dumps_json(obj: Any, compact: bool) -> bytes:
+    if compact:
+        text = json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, ensure_ascii=False, indent=2)
+    return text.encode("utf-8")
+
+
+# orjson pulls in uuid, zoneinfo and enum on import, so it is imported on
+# first use and commands that never touch JSON keep their fast start-up.
+def _dumps_orjson(obj: Any, compact: bool) -> bytes:
+    import orjson
+
+    try:
+        return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2)
+    except orjson.JSONEncodeError:
+        # orjson rejects what stdlib accepts, e.g. integers wider than 64
+        # bits, so fall back rather than fail the conversation.
+        return _dumps_json(obj, compact)
+
+
+def _loads_orjson(data: bytes | str) -> Any:
+    import orjson
+
+    try:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError:
+        # orjson rejects lone surrogate escapes such as "\ud83d", which
+        # json accepts, so invalid input only fails after both have tried.
+        return json.loads(data)
+
+
+# backend name -> (dumps, loads)
+BACKENDS: Dict[str, tuple[Callable[[Any, bool], bytes], Callable[[bytes], Any]]] = {
+    "json": (_dumps_json, json.loads),
+}
+if importlib.util.find_spec("orjson") is not None:
+    BACKENDS["orjson"] = (_dumps_orjson, _loads_orjson)
+
+BACKEND = "orjson" if "orjson" in BACKENDS else "json"
+
+
+def dumps(obj: Any, compact: bool = False, backend: str | None = None) -> bytes:
+    """Serialise ``obj`` to UTF-8 JSON, indented unless ``compact``."""
+    return BACKENDS[backend or BACKEND][0](obj, compact)
+
+
+def loads(data: bytes | str, backend: str | None = None) -> Any:
+    """Decode a JSON document from ``data``."""
+    return BACKENDS[backend or BACKEND][1](data)
+
+
+def dump(obj: Any, path: str, compact: bool = False, compress: str | None = None) -> None:
+    """Write ``obj`` as JSON to the file at ``path``, compressed with ``compress``."""
+    # Serialised first, so a chat that cannot be encoded leaves no file.
+    data = dumps(obj, compact)
+    with compression.open_write(path, compress) as fh:
+        fh.write(data)
+
+
+def load(path: str) -> Any:
+    """Read and decode the JSON file at ``path``, decompressing it if needed."""
+    with compression.open_read(path) as fh:
+        return loads(fh.read())
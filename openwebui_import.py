@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Single entry point for converting chat exports and importing them into open-webui.
+
+Each subcommand's module is imported only when that subcommand runs, so
+``openwebui-import sql`` never loads a converter and ``openwebui-import
+convert --type grok`` loads only the Grok parser.
+"""
+
+import importlib
+import sys
+
+PROG = "openwebui-import"
+
+# subcommand -> (module, entry point, summary)
+COMMANDS = {
+    "convert": ("engine", "run_cli", "Convert chat exports to open-webui JSON"),
+    "sql": ("create_sql", "main", "Create SQL inserts for open-webui chats"),
+    "batch": ("batch", "main", "Convert a folder of exports and generate SQL"),
+}
+
+
+def usage() -> str:
+    lines = [f"usage: {PROG} {{{','.join(COMMANDS)}}} ...", "", "commands:"]
+    for name, (_, _, summary) in COMMANDS.items():
+        lines.append(f"  {name:<9} {summary}")
+    lines.append("")
+    lines.append(f"Run '{PROG} <command> --help' for the options of a command.")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    # argparse subparsers would need every command's options up front; a
+    # hand-rolled dispatch keeps start-up down to importing one module.
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return
+    command = argv[0]
+    if command not in COMMANDS:
+        print(usage(), file=sys.stderr)
+        raise SystemExit(f"{PROG}: unknown command '{command}'")
+    module_name, func_name, _ = COMMANDS[command]
+    module = importlib.import_module(module_name)
+    getattr(module, func_name)(argv=argv[1:], prog=f"{PROG} {command}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Process-pool helpers for converting conversations in parallel."""
+
+from collections import deque
+from typing import TYPE_CHECKING, Any, Callable, Deque, Iterable, Iterator, List
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+CHUNK_SIZE = 16
+
+
+def _apply_chunk(fn: Callable[[Any], Any], chunk: List[Any]) -> List[Any]:
+    return [fn(item) for item in chunk]
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def imap_ordered(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[Any]:
+    """Yield ``fn(item)`` for each of ``items`` in input order.
+
+    With ``workers > 1`` the calls run in a process pool. ``items`` is consumed
+    lazily and at most ``2 * workers`` chunks are in flight, so a streamed
+    export is never fully materialised. ``fn`` must be picklable (a module
+    level function or a ``functools.partial`` of one).
+    """
+    if workers <= 1:
+        for item in items:
+            yield fn(item)
+        return
+    # Imported on demand: multiprocessing dominates start-up time otherwise.
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque["Future"] = deque()
+        for chunk in _chunks(items, chunk_size):
+            pending.append(pool.submit(_apply_chunk, fn, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
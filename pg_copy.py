@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Write open-webui chats as a PostgreSQL ``COPY`` script.
+
+This is the ``create_sql.py --format pg-copy`` mode for Open WebUI running
+on PostgreSQL. Instead of one INSERT per chat, the chats are loaded with
+``COPY ... FROM STDIN`` into a temporary table and merged into ``chat`` with
+two set-based statements, so the whole import runs at COPY speed. The script
+is run with psql, which sends the inline COPY data to the server::
+
+    psql -d openwebui -f chats.sql
+"""
+
+import shutil
+import tempfile
+from typing import Iterable, TextIO
+
+from create_sql import CHAT_COLUMNS, SPOOL_SIZE, ChatRow, tag_rows
+
+TAG_COLUMNS = ("id", "name", "user_id")
+
+# COPY text format: a backslash starts an escape, and tab and newline
+# separate columns and rows, so all four are escaped inside values.
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+COPY_NULL = "\\N"
+COPY_END = "\\."
+
+
+def _columns(columns: Iterable[str]) -> str:
+    return ",".join(f'"{c}"' for c in columns)
+
+
+def copy_field(value) -> str:
+    """Return ``value`` escaped for a COPY text-format column; None is NULL."""
+    if value is None:
+        return COPY_NULL
+    return str(value).translate(COPY_ESCAPES)
+
+
+def copy_line(values: Iterable) -> str:
+    """Return one COPY text-format row, newline included."""
+    return "\t".join(copy_field(v) for v in values) + "\n"
+
+
+def chat_copy_values(row: ChatRow) -> tuple:
+    """Return the :data:`create_sql.CHAT_COLUMNS` values for a chat row."""
+    record_id, user_id, title, created_at, chat_json, meta = row
+    return record_id, user_id, title, None, "f", created_at, created_at, chat_json, "f", meta, None
+
+
+HEADER = f"""\\set ON_ERROR_STOP on
+SET client_encoding = 'UTF8';
+BEGIN;
+CREATE TEMP TABLE "import_chat" (LIKE "chat" INCLUDING DEFAULTS) ON COMMIT DROP;
+ALTER TABLE "import_chat" ADD COLUMN "import_seq" bigserial;
+COPY "import_chat" ({_columns(CHAT_COLUMNS)}) FROM STDIN;
+"""
+
+# A chat repeated in the import keeps its last version, as in the INSERT
+# script, so only the highest import_seq of each id is inserted.
+MERGE_CHATS = f"""DELETE FROM "chat" USING "import_chat" WHERE "chat"."id" = "import_chat"."id";
+INSERT INTO "chat" ({_columns(CHAT_COLUMNS)})
+SELECT DISTINCT ON ("id") {_columns(CHAT_COLUMNS)} FROM "import_chat" ORDER BY "id", "import_seq" DESC;
+"""
+
+TAGS_HEADER = f"""CREATE TEMP TABLE "import_tag" ("id" text, "name" text, "user_id" text) ON COMMIT DROP;
+COPY "import_tag" ({_columns(TAG_COLUMNS)}) FROM STDIN;
+"""
+
+MERGE_TAGS = f"""INSERT INTO "tag" ("id","name","user_id","meta")
+SELECT {_columns(TAG_COLUMNS)},'null'::json FROM "import_tag"
+ON CONFLICT ("id","user_id") DO UPDATE SET "name"=excluded."name";
+COMMIT;
+"""
+
+
+class CopyWriter:
+    """Write a psql script that loads chats and tags with ``COPY``.
+
+    Has the same interface as :class:`create_sql.ScriptWriter`: chat rows
+    are spooled to a temporary file (kept in memory up to ``SPOOL_SIZE``)
+    and the script is written once all chats are in. The whole script is
+    one transaction.
+    """
+
+    def __init__(self, tags: list[str]) -> None:
+        self.tags = tags
+        self.user_ids: set[str] = set()
+        self.body = tempfile.SpooledTemporaryFile(SPOOL_SIZE, "w+", encoding="utf-8")
+
+    def add(self, row: ChatRow) -> None:
+        """Add the chat of a :func:`create_sql.chat_row` to the script."""
+        self.user_ids.add(row[1])
+        self.body.write(copy_line(chat_copy_values(row)))
+
+    def write_to(self, out: TextIO) -> None:
+        """Write the whole script to ``out`` and release the spooled chats."""
+        out.write(HEADER)
+        self.body.seek(0)
+        shutil.copyfileobj(self.body, out)
+        out.write(COPY_END + "\n")
+        out.write(MERGE_CHATS)
+        out.write(TAGS_HEADER)
+        for uid in sorted(self.user_ids):
+            for tag_id, name in tag_rows(uid, self.tags):
+                out.write(copy_line((tag_id, name, uid)))
+        out.write(COPY_END + "\n")
+        out.write(MERGE_TAGS)
+        self.body.close()
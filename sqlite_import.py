@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""Import open-webui chats straight into an Open WebUI SQLite database.
+
+This is the ``create_sql.py --sqlite`` mode: instead of a SQL script that is
+pasted into DB Browser, chats and tags are written with parameterised
+``executemany`` calls inside large transactions, so no statement has to be
+parsed per chat and no value needs quoting.
+
+:func:`import_chats_online` (``--online``) is for a database Open WebUI is
+using at the same time: it commits small batches sized to keep each write
+transaction under a latency cap, and backs off when the database is busy.
+"""
+
+import os
+import random
+import sqlite3
+import time
+from itertools import islice
+from typing import Iterable, NamedTuple
+from urllib.parse import quote
+
+from create_sql import ChatRow, tag_rows
+
+BATCH_SIZE = 10000
+
+# Online mode: batches of at most ONLINE_BATCH_SIZE chats, shrunk as needed
+# to keep each write transaction under MAX_TRANSACTION_MS.
+ONLINE_BATCH_SIZE = 100
+MAX_TRANSACTION_MS = 100
+BUSY_TIMEOUT_MS = 2000
+RETRIES = 8
+BACKOFF_MS = 50
+
+DELETE_CHATS = 'DELETE FROM "main"."chat" WHERE "id" IN (SELECT "id" FROM "temp"."import_ids")'
+INSERT_CHAT = (
+    'INSERT INTO "main"."chat" '
+    '("id","user_id","title","share_id","archived","created_at","updated_at","chat","pinned","meta","folder_id") '
+    "VALUES (?1,?2,?3,NULL,0,?4,?4,?5,0,?6,NULL)"
+)
+UPSERT_TAG = (
+    'INSERT INTO "main"."tag" ("id","name","user_id","meta") '
+    "VALUES (?,?,?,'null') "
+    'ON CONFLICT("id","user_id") DO UPDATE SET "name"=excluded."name"'
+)
+
+
+class ImportStats(NamedTuple):
+    chats: int
+    transactions: int
+    retries: int
+    longest_ms: float
+
+
+def connect(db_path: str, busy_timeout_ms: int = 5000) -> sqlite3.Connection:
+    """Open ``db_path`` with transactions under the caller's control.
+
+    The database must already exist: a mistyped path raises
+    ``sqlite3.OperationalError`` instead of creating an empty database.
+    ``busy_timeout_ms`` is how long SQLite waits for another connection's
+    lock before reporting the database as busy.
+    """
+    uri = f"file:{quote(os.path.abspath(db_path))}?mode=rw"
+    conn = sqlite3.connect(uri, uri=True, isolation_level=None, timeout=busy_timeout_ms / 1000)
+    conn.execute('CREATE TEMP TABLE IF NOT EXISTS "import_ids" ("id" TEXT PRIMARY KEY)')
+    return conn
+
+
+def write_chats(conn: sqlite3.Connection, rows: Iterable[ChatRow]) -> None:
+    """Replace the chats in ``rows``: delete any with the same id, then insert.
+
+    The ids go through a temporary table so the delete is one statement per
+    batch, which stays a single pass even when ``chat.id`` has no index.
+    """
+    # A chat repeated in the batch keeps its last version, as in the script.
+    latest = {row[0]: row for row in rows}
+    conn.execute('DELETE FROM "temp"."import_ids"')
+    conn.executemany('INSERT INTO "temp"."import_ids" VALUES (?)', ((chat_id,) for chat_id in latest))
+    conn.execute(DELETE_CHATS)
+    conn.executemany(INSERT_CHAT, latest.values())
+
+
+def write_tags(conn: sqlite3.Connection, user_ids: Iterable[str], tags: list[str]) -> None:
+    """Ensure the import tags exist for every user in ``user_ids``."""
+    conn.executemany(
+        UPSERT_TAG,
+        ((tag_id, name, uid) for uid in sorted(user_ids) for tag_id, name in tag_rows(uid, tags)),
+    )
+
+
+def import_chats(
+    db_path: str, rows: Iterable[ChatRow], tags: list[str], batch_size: int = BATCH_SIZE
+) -> int:
+    """Write ``rows`` and their users' tags to ``db_path``; return the chat count.
+
+    Rows are consumed lazily and committed ``batch_size`` at a time, so the
+    import never holds more than one batch in memory. A failing batch is
+    rolled back; the batches before it stay committed.
+    """
+    conn = connect(db_path)
+    rows = iter(rows)
+    user_ids: set[str] = set()
+    count = 0
+    try:
+        while batch := list(islice(rows, batch_size)):
+            conn.execute("BEGIN")
+            write_chats(conn, batch)
+            conn.execute("COMMIT")
+            user_ids.update(row[1] for row in batch)
+            count += len(batch)
+        conn.execute("BEGIN")
+        write_tags(conn, user_ids, tags)
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+    return count
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    # sqlite3 only exposes the error code from Python 3.11 on.
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    return "locked" in str(exc) or "busy" in str(exc)
+
+
+def _write_transaction(conn: sqlite3.Connection, write, retries: int, backoff_ms: int) -> tuple[float, int]:
+    """Run ``write(conn)`` in one write transaction, retrying while busy.
+
+    ``BEGIN IMMEDIATE`` takes the write lock up front, so a busy database
+    is detected before anything is written rather than at ``COMMIT``.
+    Returns how long the lock was held in milliseconds and the retries.
+    """
+    attempt = 0
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            start = time.perf_counter()
+            write(conn)
+            conn.execute("COMMIT")
+            return (time.perf_counter() - start) * 1000, attempt
+        except sqlite3.OperationalError as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            if not _is_busy(exc) or attempt == retries:
+                raise
+        # Exponential backoff with jitter so retries do not line up with
+        # the other writer's next transaction.
+        time.sleep(backoff_ms * 2 ** attempt * random.uniform(0.5, 1.5) / 1000)
+        attempt += 1
+
+
+def import_chats_online(
+    db_path: str,
+    rows: Iterable[ChatRow],
+    tags: list[str],
+    batch_size: int = ONLINE_BATCH_SIZE,
+    max_transaction_ms: float = MAX_TRANSACTION_MS,
+    busy_timeout_ms: int = BUSY_TIMEOUT_MS,
+    retries: int = RETRIES,
+    backoff_ms: int = BACKOFF_MS,
+) -> ImportStats:
+    """Import ``rows`` into a database that other processes are using.
+
+    Chats are committed in small batches so other writers are never locked
+    out for long: a batch whose transaction exceeds ``max_transaction_ms``
+    halves the next batch, and a fast one doubles it again, up to
+    ``batch_size``. Each transaction waits up to ``busy_timeout_ms`` for the
+    write lock and is retried ``retries`` times with exponential backoff
+    after that. Rows are read before the lock is taken, so parsing never
+    holds it. With a WAL-mode database readers are never blocked; otherwise
+    they wait only for the commit.
+    """
+    conn = connect(db_path, busy_timeout_ms)
+    rows = iter(rows)
+    user_ids: set[str] = set()
+    chats = transactions = total_retries = 0
+    longest = 0.0
+    size = batch_size
+
+    def run(write) -> float:
+        nonlocal transactions, total_retries, longest
+        elapsed, retried = _write_transaction(conn, write, retries, backoff_ms)
+        transactions += 1
+        total_retries += retried
+        longest = max(longest, elapsed)
+        return elapsed
+
+    try:
+        while batch := list(islice(rows, size)):
+            elapsed = run(lambda c: write_chats(c, batch))
+            if elapsed > max_transaction_ms:
+                size = max(1, size // 2)
+            elif elapsed < max_transaction_ms / 4:
+                size = min(batch_size, size * 2)
+            user_ids.update(row[1] for row in batch)
+            chats += len(batch)
+            # SQLite does not queue writers: leave the lock free for as
+            # long as it was held so a waiting writer's retry can take it.
+            time.sleep(elapsed / 1000)
+        run(lambda c: write_tags(c, user_ids, tags))
+    finally:
+        conn.close()
+    return ImportStats(chats, transactions, total_retries, longest)
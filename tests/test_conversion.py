@@ -73,3 +73,137 @@ def test_invalid_unicode(monkeypatch):
     expected = _load_expected("invalid_unicode")
     assert result == expected
 
+
+def test_iter_conversations_matches_parse(monkeypatch):
+    cases = [
+        (convert_chatgpt, convert_chatgpt.parse_chatgpt, "examples/gpt_example.json"),
+        (convert_claude, convert_claude.parse_claude, "examples/claude_example.json"),
+        (convert_grok, convert_grok.parse_grok, "examples/grok_example.json"),
+    ]
+    for module, parse, path in cases:
+        monkeypatch.setattr(module.time, "time", lambda: FAKE_TS)
+        with open(path, "r", encoding="utf-8") as fh:
+            expected = parse(json.load(fh))
+        streamed = module.iter_conversations(path)
+        assert isinstance(streamed, types.GeneratorType)
+        assert list(streamed) == expected
+
+
+def _mapping_node(key, parent, children, text, create_time=None, role="assistant"):
+    # A node of a ChatGPT or Grok ``mapping``; both exports use this shape.
+    return {
+        "id": key,
+        "parent": parent,
+        "children": children,
+        "message": {
+            "author": {"role": role},
+            "create_time": create_time,
+            "content": {"parts": [text]},
+        },
+    }
+
+
+def test_grok_mapping_follows_links():
+    mapping = {
+        "b": _mapping_node("b", "a", [], "second", 100),
+        "client-created-root": {"id": "client-created-root", "parent": None, "children": ["a"]},
+        "a": _mapping_node("a", "client-created-root", ["b"], "first", 100, role="user"),
+        # Only linked through its parent field.
+        "c": _mapping_node("c", "b", [], "third", 50),
+    }
+    conv = convert_grok.parse_grok({"conversation": {"title": "t", "create_time": 10}, "mapping": mapping})[0]
+    assert [m[1] for m in conv["messages"]] == ["first", "second", "third"]
+    assert [m[2] for m in conv["messages"]] == [100.0, 100.0, 50.0]
+
+
+def test_grok_mapping_branches_follow_listed_order():
+    mapping = {
+        "b2": _mapping_node("b2", "a", [], "second branch", 100),
+        "a": _mapping_node("a", "client-created-root", ["b1", "b2"], "first", 100, role="user"),
+        "b1": _mapping_node("b1", "a", ["c"], "first branch", 100),
+        "client-created-root": {"id": "client-created-root", "parent": None, "children": ["a"]},
+        "c": _mapping_node("c", "b1", [], "reply", 100, role="user"),
+    }
+    conv = convert_grok.parse_grok({"conversation": {"title": "t", "create_time": 10}, "mapping": mapping})[0]
+    assert [m[1] for m in conv["messages"]] == ["first", "first branch", "reply", "second branch"]
+
+
+def test_grok_mapping_without_links_sorts_by_time():
+    mapping = {
+        "x": _mapping_node("x", None, [], "late", "2025-01-02T00:00:00Z"),
+        "y": _mapping_node("y", "missing", [], "early", "2025-01-01T00:00:00Z"),
+    }
+    conv = convert_grok.parse_grok({"conversation": {"title": "t", "create_time": 10}, "mapping": mapping})[0]
+    assert [m[1] for m in conv["messages"]] == ["early", "late"]
+
+
+def test_grok_mapping_cycle_is_not_dropped():
+    mapping = {
+        "a": _mapping_node("a", "b", ["b"], "first", 1),
+        "b": _mapping_node("b", "a", ["a"], "second", 2),
+    }
+    conv = convert_grok.parse_grok({"conversation": {"title": "t", "create_time": 10}, "mapping": mapping})[0]
+    assert [m[1] for m in conv["messages"]] == ["first", "second"]
+
+
+def test_chatgpt_branches_match_linear_without_branching():
+    with open("examples/gpt_example.json", "r", encoding="utf-8") as fh:
+        data = json.load(fh)
+    linear = convert_chatgpt.parse_chatgpt(data)
+    tree = list(convert_chatgpt.iter_chatgpt(data, branches=True))
+    for lin, conv in zip(linear, tree):
+        assert conv["messages"] == lin["messages"]
+        assert conv["parents"] == [None, *range(len(lin["messages"]) - 1)]
+
+
+def test_chatgpt_branches_keep_regenerations(monkeypatch):
+    _patch(monkeypatch, convert_chatgpt)
+    mapping = {
+        "root": {"id": "root", "parent": None, "children": ["q"], "message": None},
+        "q": _mapping_node("q", "root", ["a1", "a2"], "Question?", 1, role="user"),
+        "a1": _mapping_node("a1", "q", [], "First answer.", 2),
+        "a2": _mapping_node("a2", "q", ["q2"], "Second answer.", 3),
+        "q2": _mapping_node("q2", "a2", [], "Thanks.", 4, role="user"),
+    }
+    item = {"title": "t", "create_time": 1, "mapping": mapping, "current_node": "a1"}
+    conv = list(convert_chatgpt.iter_chatgpt([item], branches=True))[0]
+    assert [m[1] for m in conv["messages"]] == ["Question?", "First answer.", "Second answer.", "Thanks."]
+    assert conv["parents"] == [None, 0, 0, 2]
+
+    out, _ = convert_chatgpt.build_webui(conv, "user")
+    history = out["history"]["messages"]
+    question = next(m for m in history.values() if m["content"] == "Question?")
+    assert len(question["childrenIds"]) == 2
+    assert [m["content"] for m in out["messages"]] == ["Question?", "First answer."]
+    assert history[out["history"]["currentId"]]["content"] == "First answer."
+
+
+def test_chatgpt_branches_follow_children_order(monkeypatch):
+    _patch(monkeypatch, convert_chatgpt)
+    # The mapping lists "a" before "b", but "q" lists "b" first, and there
+    # is no current_node: both imports fall back to the first child.
+    mapping = {
+        "root": {"id": "root", "parent": None, "children": ["q"], "message": None},
+        "a": _mapping_node("a", "q", [], "A.", 3),
+        "q": _mapping_node("q", "root", ["b", "a"], "Q?", 1, role="user"),
+        "b": _mapping_node("b", "q", [], "B.", 2),
+    }
+    item = {"title": "t", "create_time": 1, "mapping": mapping}
+    linear = convert_chatgpt.parse_chatgpt([item])[0]
+    conv = list(convert_chatgpt.iter_chatgpt([item], branches=True))[0]
+    assert [m[1] for m in linear["messages"]] == ["Q?", "B."]
+    assert [m[1] for m in conv["messages"]] == ["Q?", "B.", "A."]
+    out, _ = convert_chatgpt.build_webui(conv, "user")
+    assert [m["content"] for m in out["messages"]] == ["Q?", "B."]
+
+
+def test_chatgpt_branches_keep_parent_cycle(monkeypatch):
+    _patch(monkeypatch, convert_chatgpt)
+    mapping = {
+        "x": _mapping_node("x", "y", ["y"], "X?", 1, role="user"),
+        "y": _mapping_node("y", "x", ["x"], "Y.", 2),
+    }
+    item = {"title": "t", "create_time": 1, "mapping": mapping, "current_node": "y"}
+    conv = list(convert_chatgpt.iter_chatgpt([item], branches=True))[0]
+    assert [m[1] for m in conv["messages"]] == ["X?", "Y."]
+    assert conv["parents"] == [None, 0] and conv["current"] == 1
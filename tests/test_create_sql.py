@@ -0,0 +1,401 @@
+import os
+import sys
+import uuid
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+import create_sql
+import engine
+
+INPUTS = [
+    ("examples/gpt_example.json", "chatgpt"),
+    ("examples/claude_example.json", "claude"),
+    ("examples/grok_example.json", "grok"),
+]
+
+
+def _convert(monkeypatch, output_dir, bundle=None, compress=None):
+    counter = {"val": 0}
+
+    def fake_uuid():
+        counter["val"] += 1
+        return uuid.UUID(int=counter["val"])
+
+    monkeypatch.setattr(uuid, "uuid4", fake_uuid)
+    inputs = [(path, engine.get_format(fmt)) for path, fmt in INPUTS]
+    return engine.convert_files(inputs, "user", str(output_dir), bundle=bundle and str(bundle), compress=compress)
+
+
+def _sql(paths, output, *extra):
+    create_sql.main([*map(str, paths), "--output", str(output), "--tags", "t", *extra])
+    with open(output, "r", encoding="utf-8") as fh:
+        return fh.read().splitlines()
+
+
+def test_bundle_matches_files(tmp_path, monkeypatch):
+    files = _convert(monkeypatch, tmp_path / "files")
+    bundle = tmp_path / "chats.jsonl"
+    names = _convert(monkeypatch, tmp_path / "unused", bundle)
+    assert names == [os.path.basename(p) for p in files]
+    assert not os.path.exists(tmp_path / "unused")
+    with open(bundle, "rb") as fh:
+        assert len(fh.readlines()) == len(files)
+
+    from_files = _sql(files, tmp_path / "files.sql")
+    from_bundle = _sql([bundle], tmp_path / "bundle.sql")
+    assert from_bundle == from_files
+    # bundles in a directory are picked up like .json files
+    assert sorted(_sql([tmp_path], tmp_path / "dir.sql")) == sorted(from_bundle)
+
+
+def test_bundle_reports_failing_line(tmp_path):
+    bundle = tmp_path / "chats.jsonl"
+    bundle.write_text('{"name": "a.json", "data": {"title": "no user"}}\n', encoding="utf-8")
+    with pytest.raises(SystemExit, match="chats.jsonl:1: userId missing"):
+        create_sql.main([str(bundle)])
+
+
+def test_batch_direct_matches_files(tmp_path, monkeypatch):
+    import shutil
+
+    import batch
+
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    for path, _ in INPUTS:
+        shutil.copy(path, input_dir)
+
+    def run(name, *extra):
+        counter = {"val": 0}
+
+        def fake_uuid():
+            counter["val"] += 1
+            return uuid.UUID(int=counter["val"])
+
+        monkeypatch.setattr(uuid, "uuid4", fake_uuid)
+        output = tmp_path / f"{name}.sql"
+        batch.main([
+            "--input-dir", str(input_dir), "--user-id", "user",
+            "--output-dir", str(tmp_path / name), "--sql-output", str(output), *extra,
+        ])
+        with open(output, "r", encoding="utf-8") as fh:
+            return fh.read().splitlines()
+
+    from_files = run("files")
+    direct = run("direct", "--direct")
+    assert not os.path.exists(tmp_path / "direct")
+    assert sorted(direct) == sorted(from_files)
+
+
+TAG_TABLE = (
+    'CREATE TABLE "tag" ("id" VARCHAR(255) NOT NULL, "name" VARCHAR(255) NOT NULL, '
+    '"user_id" VARCHAR(255) NOT NULL, "meta" JSON, PRIMARY KEY ("id", "user_id"));'
+)
+
+
+def _fixture_db(path, primary_key=False):
+    import sqlite3
+
+    # examples/chat.sql is a schema dump with one chat, missing the ';'
+    # between the CREATE TABLE and the INSERT.
+    with open("examples/chat.sql", "r", encoding="utf-8") as fh:
+        script = fh.read().replace("\nINSERT INTO", ";\nINSERT INTO", 1)
+    if primary_key:
+        # Open WebUI itself declares chat.id as the primary key.
+        script = script.replace('"id" VARCHAR(255) NOT NULL,', '"id" VARCHAR(255) NOT NULL PRIMARY KEY,', 1)
+    conn = sqlite3.connect(path)
+    conn.executescript(script + "\n" + TAG_TABLE)
+    conn.close()
+    return path
+
+
+def _dump(path):
+    import sqlite3
+
+    conn = sqlite3.connect(path)
+    try:
+        return {
+            table: sorted(conn.execute(f'SELECT * FROM "{table}"').fetchall())
+            for table in ("chat", "tag")
+        }
+    finally:
+        conn.close()
+
+
+def test_sqlite_import_matches_script(tmp_path, monkeypatch):
+    import sqlite3
+
+    files = _convert(monkeypatch, tmp_path / "files")
+    script_db = _fixture_db(tmp_path / "script.db")
+    direct_db = _fixture_db(tmp_path / "direct.db")
+    conn = sqlite3.connect(script_db)
+    conn.executescript("\n".join(_sql(files, tmp_path / "chats.sql")))
+    conn.close()
+
+    for _ in range(2):  # importing again replaces rather than duplicates
+        create_sql.main([*map(str, files), "--tags", "t", "--sqlite", str(direct_db), "--batch-size", "2"])
+    imported = _dump(direct_db)
+    assert imported == _dump(script_db)
+    assert len(imported["chat"]) == len(files) + 1
+
+
+def test_sqlite_import_requires_existing_db(tmp_path):
+    import sqlite3
+
+    with pytest.raises(sqlite3.OperationalError):
+        create_sql.main([str(tmp_path), "--sqlite", str(tmp_path / "missing.db")])
+    assert not os.path.exists(tmp_path / "missing.db")
+
+
+# Stands in for Open WebUI: holds the write lock for a while, then keeps
+# writing and reading while the import runs.
+STAND_IN = """
+import sqlite3, sys, time
+conn = sqlite3.connect(sys.argv[1], isolation_level=None, timeout=10)
+for i in range(5):
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("INSERT INTO tag VALUES (?, 'stand-in', 'other', 'null')", (f"stand-in-{i}",))
+    if i == 0:
+        print("locked", flush=True)
+    time.sleep(0.2)
+    conn.execute("COMMIT")
+    conn.execute("SELECT count(*) FROM chat").fetchone()
+    time.sleep(0.02)
+"""
+
+
+def test_sqlite_online_import_with_concurrent_writer(tmp_path, monkeypatch):
+    import subprocess
+
+    import sqlite_import
+
+    files = _convert(monkeypatch, tmp_path / "files")
+    db = _fixture_db(tmp_path / "live.db")
+    stand_in = subprocess.Popen(
+        [sys.executable, "-c", STAND_IN, str(db)], stdout=subprocess.PIPE, text=True
+    )
+    try:
+        assert stand_in.stdout.readline() == "locked\n"
+        rows = [create_sql.chat_row(create_sql.load_json(p), p, ["t"]) for p in files]
+        stats = sqlite_import.import_chats_online(
+            str(db), rows, ["t"], batch_size=1, busy_timeout_ms=20, backoff_ms=20
+        )
+    finally:
+        assert stand_in.wait(timeout=30) == 0
+    assert stats.chats == len(files)
+    assert stats.transactions == len(files) + 1
+    assert stats.retries >= 1
+    tables = _dump(db)
+    assert len(tables["chat"]) == len(files) + 1
+    assert sum(row[1] == "stand-in" for row in tables["tag"]) == 5
+
+
+def test_upsert_script_matches_delete_insert(tmp_path, monkeypatch):
+    import sqlite3
+
+    files = _convert(monkeypatch, tmp_path / "files")
+    scripts = {
+        "delete": _sql(files, tmp_path / "delete.sql"),
+        "upsert": _sql([*files, files[0]], tmp_path / "upsert.sql", "--upsert-batch", "2"),
+    }
+    assert scripts["upsert"][0] == "BEGIN;" and scripts["upsert"][-1] == "COMMIT;"
+    dumps = {}
+    for name, script in scripts.items():
+        db = _fixture_db(tmp_path / f"{name}.db", primary_key=True)
+        conn = sqlite3.connect(db)
+        for _ in range(2):  # applying again replaces rather than duplicates
+            conn.executescript("\n".join(script))
+        conn.close()
+        dumps[name] = _dump(db)
+    assert dumps["upsert"] == dumps["delete"]
+    assert len(dumps["upsert"]["chat"]) == len(files) + 1
+
+
+@pytest.mark.parametrize("compress", ["gzip", "zstd"])
+def test_compressed_output_matches(tmp_path, monkeypatch, compress):
+    import compression
+
+    if compress == "zstd":
+        pytest.importorskip("zstandard")
+    suffix = compression.SUFFIXES[compress]
+    expected = _sql(_convert(monkeypatch, tmp_path / "plain"), tmp_path / "plain.sql")
+
+    files = _convert(monkeypatch, tmp_path / "files", compress=compress)
+    assert all(p.endswith(".json" + suffix) and compression.detect(p) == compress for p in files)
+    _convert(monkeypatch, tmp_path / "unused", tmp_path / "chats.jsonl", compress=compress)
+    bundle = tmp_path / f"chats.jsonl{suffix}"
+    assert compression.detect(str(bundle)) == compress
+
+    for source in (files, [bundle]):
+        create_sql.main([*map(str, source), "--tags", "t", "--output", str(tmp_path / "out.sql"), "--compress", compress])
+        with compression.open_read(str(tmp_path / f"out.sql{suffix}")) as fh:
+            assert fh.read().decode("utf-8").splitlines() == expected
+
+
+def _copy_unescape(field):
+    # PostgreSQL COPY text format, as the server reads it.
+    import re
+
+    if field == "\\N":
+        return None
+    simple = {"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+    def repl(m):
+        octal, hexa, char = m.groups()
+        if octal:
+            return chr(int(octal, 8))
+        if hexa:
+            return chr(int(hexa, 16))
+        return simple.get(char, char)
+
+    return re.sub(r"\\(?:([0-7]{1,3})|x([0-9a-fA-F]{1,2})|(.))", repl, field, flags=re.S)
+
+
+def _copy_blocks(script):
+    """Return ``{table: [row dict, ...]}`` for the COPY ... FROM STDIN blocks."""
+    blocks = {}
+    lines = iter(script.split("\n"))  # COPY rows end at \n only
+    for line in lines:
+        if not (line.startswith("COPY ") and line.endswith(" FROM STDIN;")):
+            continue
+        table = line.split('"')[1]
+        columns = [c.strip('"') for c in line[line.index("(") + 1 : line.index(")")].split(",")]
+        rows = blocks.setdefault(table, [])
+        for data in lines:
+            if data == "\\.":
+                break
+            fields = data.split("\t")
+            assert len(fields) == len(columns), data
+            rows.append(dict(zip(columns, map(_copy_unescape, fields))))
+    return blocks
+
+
+def test_pg_copy_round_trip(tmp_path, monkeypatch):
+    import json
+
+    files = _convert(monkeypatch, tmp_path / "files")
+    awkward = tmp_path / f"awkward_{uuid.UUID(int=99)}.json"
+    title = "tab\there\nnew line\\backslash\rreturn sep \\N \\. '\"quotes\"'"
+    awkward.write_text(
+        json.dumps({"userId": "other", "title": title, "timestamp": 1700000000000, "messages": [{"content": "a\\nb"}]}),
+        encoding="utf-8",
+    )
+    files.append(str(awkward))
+    create_sql.main([*files, "--tags", "t", "--format", "pg-copy", "--output", str(tmp_path / "pg.sql")])
+    with open(tmp_path / "pg.sql", "r", encoding="utf-8", newline="") as fh:
+        script = fh.read()
+    assert script.rstrip("\n").endswith("COMMIT;")
+    blocks = _copy_blocks(script)
+
+    expected = list(create_sql.iter_rows(files, ["t"]))
+    assert len(blocks["import_chat"]) == len(expected)
+    for got, row in zip(blocks["import_chat"], expected):
+        record_id, user_id, row_title, created_at, chat_json, meta = row
+        assert got == {
+            "id": record_id, "user_id": user_id, "title": row_title, "share_id": None, "archived": "f",
+            "created_at": str(created_at), "updated_at": str(created_at), "chat": chat_json,
+            "pinned": "f", "meta": meta, "folder_id": None,
+        }
+    assert blocks["import_chat"][-1]["title"] == title
+    assert json.loads(blocks["import_chat"][-1]["chat"])["messages"][0]["content"] == "a\\nb"
+
+    assert blocks["import_tag"] == [
+        {"id": tag_id, "name": name, "user_id": uid}
+        for uid in ("other", "user")
+        for tag_id, name in create_sql.tag_rows(uid, ["t"])
+    ]
+
+
+def test_pg_copy_rejects_sqlite_options(tmp_path):
+    for extra in (["--sqlite", str(tmp_path / "x.db")], ["--upsert-batch", "2"]):
+        with pytest.raises(SystemExit):
+            create_sql.main(["examples", "--format", "pg-copy", *extra])
+
+
+def test_utf8_script_matches_ascii(tmp_path, monkeypatch):
+    import json
+    import sqlite3
+
+    files = _convert(monkeypatch, tmp_path / "files")
+    multilingual = tmp_path / f"multilingual_{uuid.UUID(int=98)}.json"
+    # A lone surrogate escape, as in exports cut mid-emoji, cannot be UTF-8.
+    multilingual.write_text(
+        '{"userId": "user", "title": "Café 日本", "timestamp": 0,'
+        ' "messages": [{"content": "你好 \U0001f600 it\'s \\ud83d"}]}',
+        encoding="utf-8",
+    )
+    files.append(str(multilingual))
+
+    dumps = {}
+    for name, extra in (("ascii", []), ("utf8", ["--utf8"])):
+        script = "\n".join(_sql(files, tmp_path / f"{name}.sql", *extra))
+        assert ("你好" in script) == bool(extra) and "\\ud83d\"" in script
+        db = _fixture_db(tmp_path / f"{name}.db")
+        conn = sqlite3.connect(db)
+        conn.executescript(script)
+        conn.close()
+        dumps[name] = _dump(db)
+        chats = {row[0]: row for row in dumps[name]["chat"]}
+        dumps[name]["chat"] = [(*row[:7], json.loads(row[7]), *row[8:]) for row in dumps[name]["chat"]]
+        assert json.loads(chats[str(uuid.UUID(int=98))][7])["messages"][0]["content"].endswith("it's \ud83d")
+    assert dumps["utf8"] == dumps["ascii"]
+    sizes = {name: os.path.getsize(tmp_path / f"{name}.sql") for name in dumps}
+    assert sizes["utf8"] < sizes["ascii"]
+
+
+def test_raw_matches_decoded(tmp_path, monkeypatch):
+    import json
+    import sqlite3
+
+    indented = _convert(monkeypatch, tmp_path / "indented")
+    # Indented files are not copied raw, so the script does not change.
+    assert _sql(indented, tmp_path / "indented.sql", "--raw") == _sql(indented, tmp_path / "expected.sql")
+
+    monkeypatch.setattr(uuid, "uuid4", lambda it=iter(range(1, 100)): uuid.UUID(int=next(it)))
+    inputs = [(path, engine.get_format(fmt)) for path, fmt in INPUTS]
+    compact = engine.convert_files(inputs, "user", str(tmp_path / "compact"), compact=True)
+    bundle = tmp_path / "chats.jsonl"
+    _convert(monkeypatch, tmp_path / "unused", bundle)
+
+    def decoded(path):
+        dump = _dump(path)
+        dump["chat"] = [(*row[:7], json.loads(row[7]), *row[8:]) for row in dump["chat"]]
+        return dump
+
+    dumps = []
+    for name, paths, extra in (
+        ("decoded", compact, []),
+        ("raw", compact, ["--raw"]),
+        ("raw-utf8", compact, ["--raw", "--utf8"]),
+        ("raw-bundle", [bundle], ["--raw", "--utf8"]),
+    ):
+        script = _sql(paths, tmp_path / f"{name}.sql", *extra)
+        db = _fixture_db(tmp_path / f"{name}.db")
+        conn = sqlite3.connect(db)
+        conn.executescript("\n".join(script))
+        conn.close()
+        dumps.append(decoded(db))
+        if "--utf8" in extra:
+            # Compact JSON as written by the converter: no spaces after ':'.
+            assert any('"title":"' in line for line in script)
+    assert all(dump == dumps[0] for dump in dumps)
+
+
+def test_raw_chat_row_falls_back():
+    name = f"chat_{uuid.UUID(int=1)}.json"
+    chat = '{"id":"","title":"t","history":{},"messages":[],"tags":[],"timestamp":5000,"files":[],"userId":"u"}'
+    assert create_sql.raw_chat_row(chat, name, ["t"])[1:4] == ("u", "t", 5)
+    assert create_sql.raw_chat_row(f'[{{"id":"","user_id":"w","title":"t","chat":{chat}}}]', name, ["t"])[1] == "w"
+    for text in (
+        chat.replace(',"userId":"u"', ""),  # no user: chat_row reports it
+        f'[{{"id":"","title":"t","chat":{chat}}}]',  # wrapper without user_id
+        f'[{{"id":"","user_id":"w","chat":{chat},"extra":1}}]',  # chat is not last
+        chat.replace('"title":"t"', '"title":"é"'),  # non-ASCII without utf8
+        chat.replace(",", ",\n"),  # indented
+        chat.replace('"files":[]', '"files":[],"more":1'),  # not a build_webui chat
+    ):
+        assert create_sql.raw_chat_row(text, name, ["t"]) is None, text
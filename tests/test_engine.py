@@ -0,0 +1,241 @@
+import json
+import os
+import sys
+import zipfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+import engine
+import json_backend
+
+
+def test_get_format_loads_plugin():
+    plugin = engine.get_format("grok")
+    assert plugin.subdir == "grok"
+    assert engine.FORMATS["grok"] is plugin
+    with pytest.raises(ValueError):
+        engine.get_format("unknown")
+
+
+def test_get_format_reports_broken_converter(tmp_path, monkeypatch):
+    (tmp_path / "convert_broken.py").write_text("import no_such_dependency\n", encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    with pytest.raises(ModuleNotFoundError, match="no_such_dependency"):
+        engine.get_format("broken")
+
+
+def test_convert_files_mixed_formats(tmp_path, capsys):
+    inputs = [
+        ("examples/gpt_example.json", engine.get_format("chatgpt")),
+        ("examples/grok_example.json", engine.get_format("grok")),
+        ("examples/missing.json", engine.get_format("claude")),
+        ("examples/aistudio_example.json", engine.get_format("aistudio")),
+    ]
+    written = engine.convert_files(inputs, "user", str(tmp_path), workers=2)
+    assert sorted(os.path.relpath(p, tmp_path).split(os.sep)[0] for p in written) == [
+        "aistudio", "chatgpt", "grok",
+    ]
+    out = capsys.readouterr().out
+    assert "Failed to convert examples/missing.json" in out
+    assert "Converted: examples/aistudio_example.json" in out
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_convert_file_skips_failing_conversation(tmp_path, capsys, workers):
+    with open("examples/gpt_example.json", encoding="utf-8") as fh:
+        export = json.load(fh)
+    good = dict(export[0], conversation_id="00000000-0000-0000-0000-000000000002")
+    # A lone surrogate in the title cannot be written as UTF-8.
+    bad = dict(export[0], title=export[0]["title"] + "\ud83d", conversation_id="00000000-0000-0000-0000-000000000001")
+    src = tmp_path / "export.json"
+    src.write_text(json.dumps([bad, good]), encoding="utf-8")
+    written = engine.convert_file(engine.get_format("chatgpt"), str(src), "user", str(tmp_path / "out"), workers=workers)
+    assert len(written) == 1 and written[0].endswith("00000000-0000-0000-0000-000000000002.json")
+    assert f"Failed to convert {src}: " in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("workers, bundle", [(1, False), (2, False), (1, True)])
+def test_convert_files_skips_failing_conversation(tmp_path, capsys, workers, bundle):
+    with open("examples/gpt_example.json", encoding="utf-8") as fh:
+        export = json.load(fh)
+    # A lone surrogate in the title cannot be written as UTF-8.
+    export[0]["title"] += "\ud83d"
+    export[0]["conversation_id"] = "00000000-0000-0000-0000-000000000001"
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps(export), encoding="utf-8")
+    inputs = [(str(bad), engine.get_format("chatgpt")), ("examples/grok_example.json", engine.get_format("grok"))]
+    chats = engine.convert_files(
+        inputs, "user", str(tmp_path / "out"), workers=workers, bundle=bundle and str(tmp_path / "chats.jsonl")
+    )
+    assert len(chats) == 1 and "9592deb7" in chats[0]
+    assert f"Failed to convert {bad}: " in capsys.readouterr().out
+    assert not os.path.exists(tmp_path / "out" / "chatgpt") or not os.listdir(tmp_path / "out" / "chatgpt")
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("gpt_example.json", "chatgpt"),
+    ("invalid_unicode.json", "chatgpt"),
+    ("claude_example.json", "claude"),
+    ("claude_thinking_example.json", "claude"),
+    ("grok_example.json", "grok"),
+    ("aistudio_example.json", "aistudio"),
+    ("webui-json.json", None),
+    ("chat.sql", None),
+])
+def test_detect_format_examples(name, expected):
+    assert engine.detect_format(os.path.join("examples", name)) == expected
+
+
+def test_detect_format_ignores_message_text(tmp_path):
+    path = tmp_path / "export"
+    path.write_text(
+        '[{"uuid": "1", "chat_messages": [{"text": "the \\"responses\\": key"}]}]',
+        encoding="utf-8",
+    )
+    assert engine.detect_format(str(path)) == "claude"
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write("examples/grok_example.json", "prod-grok-backend.json")
+    assert engine.detect_format(str(archive)) == "grok"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Hello there. How are you?", "How are you?"),
+    ("Wait... what?!", "!"),
+    ("First line.\nSecond line without stop", "First line."),
+    ("  no punctuation\n\nlast line  \n", "last line"),
+    ("x = 1\r\ny = 2", "y = 2"),
+    ("", ""),
+    ("   \n ", ""),
+    (None, ""),
+])
+def test_extract_last_sentence(text, expected):
+    assert engine.extract_last_sentence(text) == expected
+
+
+def test_extract_last_sentence_long_text():
+    code = "    total += values[index]  # no sentence stops here\n" * 5000
+    assert engine.extract_last_sentence("Try this:\n" + code + "done") == "done"
+    assert engine.extract_last_sentence("Intro. " + code) == "Intro."
+
+
+def test_sanitize_text():
+    text = "caf\u00e9\ue000 ok\uf8ff"
+    assert engine.sanitize_text(text) == "café ok"
+    assert engine.sanitize_text("plain ascii") == "plain ascii"
+    assert engine.sanitize_text(42) == ""
+
+
+def test_parse_timestamp():
+    assert engine.parse_timestamp("2025-06-21T20:47:33.491955Z", 0.0) == 1750538853.491955
+    assert engine.parse_timestamp("2025-06-21T20:47:33+00:00", 0.0) == 1750538853.0
+    assert engine.parse_timestamp(1750538853, 0.0) == 1750538853.0
+    assert engine.parse_timestamp("not a date", 5.0) == 5.0
+    assert engine.parse_timestamp(None, 5.0) == 5.0
+    assert engine.parse_iso_timestamp("2025-02-30T00:00:00Z") is None
+
+
+def test_claude_reasoning_duration_mixed_times():
+    import convert_claude
+
+    block = convert_claude._format_reasoning_block({
+        "thinking": "Hmm",
+        "start_timestamp": 1750538850.4,
+        "stop_timestamp": "2025-06-21T20:47:33.400000Z",
+    })
+    assert 'duration="3"' in block
+
+
+def test_build_webui_links_messages():
+    conv = {
+        "title": "t",
+        "timestamp": 1.0,
+        "messages": [
+            engine.Message("user", "Hi.", 1.0),
+            engine.Message("assistant", "Hello. How can I help?", 2.0),
+            engine.Message("user", "Bye.", 3.0),
+        ],
+    }
+    out, _ = engine.build_webui(conv, "user", "model", "Model")
+    first, second, third = out["messages"]
+    assert first["childrenIds"] == [second["id"]]
+    assert second["parentId"] == first["id"] and second["childrenIds"] == [third["id"]]
+    assert third["childrenIds"] == []
+    assert second["lastSentence"] == "How can I help?"
+    assert second["usage"] == {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+    assert first["models"] == third["models"] == ["model"]
+    assert out["history"]["currentId"] == third["id"]
+
+
+def test_build_webui_output_can_be_mutated():
+    conv = {
+        "title": "t",
+        "timestamp": 1.0,
+        "messages": [
+            engine.Message("user", "Hi.", 1.0),
+            engine.Message("assistant", "Hello.", 2.0),
+            engine.Message("assistant", "Again.", 3.0),
+        ],
+    }
+    out, _ = engine.build_webui(conv, "user", "model", "Model")
+    out["messages"][0]["models"].append("other")
+    out["messages"][1]["usage"]["total_tokens"] = 5
+    assert out["models"] == ["model"]
+    assert out["messages"][2]["usage"]["total_tokens"] == 0
+    again, _ = engine.build_webui(conv, "user", "model", "Model")
+    assert again["messages"][0]["models"] == ["model"]
+    assert again["messages"][1]["usage"]["total_tokens"] == 0
+
+
+def test_build_webui_layouts(monkeypatch):
+    import uuid
+
+    # Two branches: the edited second question is the current one.
+    conv = {
+        "title": "t",
+        "timestamp": 1.0,
+        "messages": [
+            engine.Message("user", "Hi.", 1.0),
+            engine.Message("user", "Old.", 2.0),
+            engine.Message("user", "New.", 3.0),
+        ],
+        "parents": [None, 0, 0],
+        "current": 2,
+    }
+    outs = {}
+    for layout in engine.LAYOUTS:
+        monkeypatch.setattr(uuid, "uuid4", lambda it=iter(range(1, 100)): uuid.UUID(int=next(it)))
+        outs[layout], _ = engine.build_webui(conv, "user", "model", "Model", layout)
+    full = outs["full"]
+    assert [m["content"] for m in full["messages"]] == ["Hi.", "New."]
+    assert outs["history"] == {**full, "messages": []}
+    assert outs["list"] == {k: v for k, v in full.items() if k != "history"}
+
+
+def test_json_backends_match():
+    obj = [{"title": "Café ☃", "n": [1, 2.5, None, True], "nested": {"a": "\"q\"\n"}}]
+    for compact in (False, True):
+        outputs = {json_backend.dumps(obj, compact, name) for name in json_backend.BACKENDS}
+        assert len(outputs) == 1
+        assert json_backend.loads(outputs.pop()) == obj
+    assert json_backend.dumps(obj, compact=True, backend="json") == json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def test_convert_files_compact(tmp_path):
+    import create_sql
+
+    inputs = [("examples/gpt_example.json", engine.get_format("chatgpt"))]
+    indented = engine.convert_files(inputs, "user", str(tmp_path / "indent"))
+    compact = engine.convert_files(inputs, "user", str(tmp_path / "compact"), compact=True)
+    for a, b in zip(indented, compact):
+        with open(b, "rb") as fh:
+            data = fh.read()
+        assert b"\n" not in data
+        assert len(data) < os.path.getsize(a)
+        assert create_sql.load_json(b)[0]["title"] == create_sql.load_json(a)[0]["title"]
@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import sys
+import zipfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import convert_grok
+from export_index import INDEX_SUFFIX, ExportIndex, load_selected
+
+
+def _copy(tmp_path, name):
+    dest = tmp_path / name
+    shutil.copy(os.path.join("examples", name), dest)
+    return str(dest)
+
+
+def test_index_spans_decode_to_items(tmp_path):
+    path = _copy(tmp_path, "claude_example.json")
+    index = ExportIndex(path)
+    with open(path, "r", encoding="utf-8") as fh:
+        expected = json.load(fh)
+    assert len(index.entries) == len(expected)
+    with open(path, "rb") as fh:
+        raw = fh.read()
+    for (conv_id, _, start, end), item in zip(index.entries, expected):
+        assert conv_id == item["uuid"]
+        assert json.loads(raw[start:end]) == item
+
+
+def test_index_sidecar_reused_and_refreshed(tmp_path):
+    path = str(tmp_path / "export.json")
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump([{"id": "a", "title": "Ünïcode"}], fh)
+    first = ExportIndex(path)
+    assert os.path.exists(path + INDEX_SUFFIX)
+    assert ExportIndex(path).entries == first.entries
+
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump([{"id": "a", "title": "Ünïcode"}, {"id": "b", "title": "Second"}], fh)
+    refreshed = ExportIndex(path)
+    assert [e[0] for e in refreshed.entries] == ["a", "b"]
+    assert list(refreshed.load(["Second"])) == [{"id": "b", "title": "Second"}]
+
+
+def test_grok_convert_selected(tmp_path):
+    path = _copy(tmp_path, "grok_example.json")
+    outdir = tmp_path / "out"
+    convert_grok.convert_file(path, "user", str(outdir), ["missing"])
+    assert not os.listdir(outdir)
+    convert_grok.convert_file(path, "user", str(outdir), ["9592deb7-27bc-4359-abb5-0967736999e9"])
+    assert os.listdir(outdir) == [
+        "Photosynthesis_Simplified_Process_and_Importance_9592deb7-27bc-4359-abb5-0967736999e9.json"
+    ]
+
+
+def test_load_selected_from_zip(tmp_path):
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write("examples/grok_example.json", "export/prod-grok-backend.json")
+    items = load_selected(str(archive), ["Photosynthesis Simplified: Process and Importance"])
+    assert [i["conversation"]["conversation_id"] for i in items] == ["9592deb7-27bc-4359-abb5-0967736999e9"]
@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+from export_reader import iter_json_items, open_export
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_items_matches_json_load(chunk_size):
+    with open("examples/gpt_example.json", "r", encoding="utf-8") as fh:
+        expected = json.load(fh)
+    with open("examples/gpt_example.json", "r", encoding="utf-8") as fh:
+        items = list(iter_json_items(fh, chunk_size=chunk_size))
+    assert items == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('[1, 23 ,"a]", {"b": [1, 2]}, null]', [1, 23, "a]", {"b": [1, 2]}, None]),
+    ("  []  ", []),
+    ('{"title": "single"}', [{"title": "single"}]),
+])
+def test_iter_json_items_values(text, expected):
+    assert list(iter_json_items(io.StringIO(text), chunk_size=2)) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4])
+def test_iter_json_items_numbers(chunk_size):
+    text = "[1.5, 2, -2.5e10, 1, 0.25E-3, 123456, -0, 7e+2]"
+    assert list(iter_json_items(io.StringIO(text), chunk_size=chunk_size)) == json.loads(text)
+
+
+@pytest.mark.parametrize("text", ["", "[1, 2", "[1 2]"])
+def test_iter_json_items_invalid(text):
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_items(io.StringIO(text), chunk_size=2))
+
+
+def test_chatgpt_convert_file_streams(tmp_path):
+    convs = [
+        {"title": f"Chat {i}", "create_time": 1700000000 + i, "conversation_id": f"c{i}",
+         "chat_messages": [{"text": "Hello."}, {"text": f"Reply {i}."}]}
+        for i in range(3)
+    ]
+    src = tmp_path / "export.json"
+    src.write_text(json.dumps(convs), encoding="utf-8")
+    convert_chatgpt.convert_file(str(src), "user", str(tmp_path / "out"))
+    names = sorted(os.listdir(tmp_path / "out"))
+    assert names == ["Chat_0_c0.json", "Chat_1_c1.json", "Chat_2_c2.json"]
+    with open(tmp_path / "out" / "Chat_1_c1.json", "r", encoding="utf-8") as fh:
+        chat = json.load(fh)[0]["chat"]
+    assert [m["content"] for m in chat["messages"]] == ["Hello.", "Reply 1."]
+
+
+def test_open_export_reads_zip_member(tmp_path):
+    archive = tmp_path / "export.zip"
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("chat.html", "<html></html>")
+        zf.write("examples/gpt_example.json", "conversations.json")
+    outdir = tmp_path / "out"
+    convert_chatgpt.convert_file(str(archive), "user", str(outdir))
+    with open_export(str(archive)) as fh:
+        items = list(iter_json_items(fh))
+    with open("examples/gpt_example.json", "r", encoding="utf-8") as fh:
+        assert items == json.load(fh)
+    assert os.listdir(outdir) == ["How_photosynthesis_works_6857150a-cd20-800f-a5f7-d2404f94b935.json"]
@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import pytest
+
+import openwebui_import
+
+# Print the modules a subcommand has imported once it has finished.
+PROBE = """
+import json, sys
+sys.argv = ["openwebui-import"] + sys.argv[1:]
+import openwebui_import
+try:
+    openwebui_import.main()
+finally:
+    print(json.dumps(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+def imported_modules(tmp_path, *args):
+    proc = subprocess.run(
+        [sys.executable, "-c", PROBE, *args],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert proc.returncode == 0, proc.stderr
+    return set(json.loads(proc.stderr.splitlines()[-1]))
+
+
+def test_convert_imports_only_requested_format(tmp_path):
+    modules = imported_modules(
+        tmp_path, "convert", "--type", "grok", "--userid", "u",
+        "--output-dir", str(tmp_path), "examples/grok_example.json",
+    )
+    assert "convert_grok" in modules
+    assert not {"convert_chatgpt", "convert_claude", "convert_aistudio"} & modules
+    assert "multiprocessing" not in modules
+    assert os.listdir(tmp_path / "grok")
+
+
+def test_sql_imports_no_converters(tmp_path):
+    modules = imported_modules(tmp_path, "sql", "--help")
+    assert "create_sql" in modules
+    assert not {name for name in modules if name.startswith("convert_")}
+    assert "engine" not in modules
+
+
+def test_unknown_command(capsys):
+    with pytest.raises(SystemExit):
+        openwebui_import.main(["bogus"])
+    assert "usage: openwebui-import" in capsys.readouterr().err
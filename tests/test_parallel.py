@@ -0,0 +1,46 @@
+import json
+import os
+import re
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import convert_chatgpt
+from parallel import imap_ordered
+
+UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def _square(value):
+    return value * value
+
+
+def _normalized(outdir):
+    result = {}
+    for name in sorted(os.listdir(outdir)):
+        with open(os.path.join(outdir, name), "r", encoding="utf-8") as fh:
+            text = fh.read()
+        seen = {}
+        result[name] = UUID_RE.sub(lambda m: seen.setdefault(m.group(0), f"uuid-{len(seen)}"), text)
+    return result
+
+
+def test_imap_ordered_keeps_order():
+    assert list(imap_ordered(_square, iter(range(50)), workers=2, chunk_size=3)) == [i * i for i in range(50)]
+
+
+def test_parallel_output_matches_serial(tmp_path):
+    convs = [
+        {"title": f"Chat {i}", "create_time": 1700000000 + i, "conversation_id": f"c{i}",
+         "chat_messages": [{"text": "Question?"}, {"text": f"Answer {i}. Done!"}]}
+        for i in range(40)
+    ]
+    src = tmp_path / "export.json"
+    src.write_text(json.dumps(convs), encoding="utf-8")
+    convert_chatgpt.convert_file(str(src), "user", str(tmp_path / "serial"))
+    convert_chatgpt.convert_file(str(src), "user", str(tmp_path / "parallel"), workers=3)
+    serial = _normalized(tmp_path / "serial")
+    assert len(serial) == 40
+    assert serial == _normalized(tmp_path / "parallel")